@@ -117,15 +117,12 @@ def run_as_plugin(handle, params_str):
 
             # 3. Cria itens para o Kodi
             for actor in cast_list:
-                name = actor.getLabel()
-                role = actor.getLabel2()
+                # cast_list contém modelos (resources.lib.models.Credit), não ListItems
+                name = actor.label
+                role = actor.label2
 
                 # Correção de imagem: Prioriza Thumb -> Poster -> Fallback
-                real_image = actor.getArt('thumb')
-                if not real_image:
-                    real_image = actor.getArt('poster')
-                if not real_image:
-                    real_image = 'DefaultActorSolid.png'
+                real_image = actor.art.get('thumb') or actor.art.get('poster') or 'DefaultActorSolid.png'
 
                 li = xbmcgui.ListItem(label=name)
                 li.setLabel2(role)
@@ -162,6 +159,11 @@ class Main:
             perform_warmup()
             return
 
+        if self.params.get('mode') == 'benchmark':
+            from resources.lib.benchmark import run_benchmarks
+            xbmcgui.Dialog().textviewer('Embuary Info - Benchmark', run_benchmarks())
+            return
+
         if self.params.get('mode') == 'reset_scroll':
             # OTIMIZAÇÃO: Verifica warm-up ANTES de criar Dialog
             # STRATEGY: Wait for window animation -> Set Property to create control -> Set Focus
@@ -0,0 +1,276 @@
+#!/usr/bin/python
+# coding: utf-8
+
+########################
+
+import xbmc
+import copy
+import time
+from threading import Lock
+from contextlib import contextmanager
+from collections import OrderedDict
+
+from resources.lib.helper import *
+from resources.lib.tmdb import tmdb_query, tmdb_trim_payload, tmdb_upgrade_payload, TMDB_SCHEMA_KEY, TMDB_SCHEMA_VERSION, DEFAULT_LANGUAGE
+from resources.lib.cache_manager import get_cache_manager
+
+########################
+
+''' Planner for append_to_response. Every consumer of a movie/tv show asks for the
+    parts it needs, the planner merges them into one superset request per title and
+    serves all consumers from the shared result.
+
+    The merged response is the canonical cached document of the title (one per type,
+    tmdb_id, language and country). Consumers get a projection of it, never a stored copy.
+'''
+
+# Partes (append_to_response) que cada consumidor precisa
+CONSUMER_PARTS = {
+    'full': ('release_dates', 'content_ratings', 'external_ids', 'credits', 'videos', 'translations', 'similar', 'images'),
+    'details': ('release_dates', 'content_ratings', 'external_ids', 'credits'),
+    'skeleton': ('release_dates', 'content_ratings', 'external_ids', 'credits', 'translations'),
+    'extras': ('videos', 'similar', 'images'),
+    'cast': ('credits',),
+    'crew': ('credits',),
+    'collection': ('external_ids',),
+    'similar': ('similar',),
+    'youtube': ('videos',),
+    'images': ('images',),
+    'seasons': ('external_ids',),
+    'meta': ('release_dates', 'content_ratings', 'external_ids'),
+    'header': ('content_ratings', 'external_ids'),
+    'preload': ('credits',),
+    'bios': ('credits',)
+}
+
+# Campos do documento que cada consumidor lê (projeção). Consumidores fora
+# desta tabela (full, details, skeleton, collection, seasons, header) recebem o documento inteiro.
+CONSUMER_FIELDS = {
+    'cast': ('id', 'credits'),
+    'crew': ('id', 'credits', 'created_by'),
+    'similar': ('id', 'similar'),
+    'youtube': ('id', 'videos'),
+    'images': ('id', 'images'),
+    'extras': ('id', 'videos', 'similar', 'images'),
+    'meta': ('id', 'imdb_id', 'budget', 'revenue', 'production_companies', 'production_countries',
+             'networks', 'origin_country', 'external_ids', 'release_dates', 'content_ratings'),
+    'preload': ('id', 'credits'),
+    'bios': ('id', 'credits')
+}
+
+# Partes válidas para cada tipo de mídia
+MEDIA_PARTS = {
+    'movie': frozenset(['release_dates', 'external_ids', 'credits', 'videos', 'translations', 'similar', 'images']),
+    'tv': frozenset(['content_ratings', 'external_ids', 'credits', 'videos', 'translations', 'similar', 'images'])
+}
+
+# Partes leves que praticamente todo consumidor de um título acaba pedindo
+# (service, dialog). Entram em toda requisição que já precisa ir à rede, para
+# que os próximos consumidores sejam servidos sem nova chamada. Os créditos
+# ficam de fora: elenco e equipe completos pesam mais que o resto do documento
+# e só são baixados por quem os lê.
+COMPANION_PARTS = ('release_dates', 'content_ratings', 'external_ids')
+
+TITLE_MEMO_SIZE = 50
+
+# Idade máxima de um documento no memo (o service roda por dias; depois disso
+# o documento é relido da tabela, que pode ter sido atualizada por outro processo)
+TITLE_MEMO_TTL = 60 * 60
+
+########################
+
+def title_locale(language):
+    ''' Language and certification country of a document. The release dates and content
+        ratings are trimmed to COUNTRY_CODE/US, so a country change needs other documents.
+    '''
+    return language + '@' + COUNTRY_CODE
+
+
+class AppendPlanner:
+    """
+    Coalesce requisições do mesmo título (tipo, id, idioma e país).
+
+    Features:
+    - Um lock por título: consumidores simultâneos aguardam a requisição em
+      andamento em vez de disparar a sua. O lock é descartado quando o último
+      consumidor termina
+    - Se faltarem partes, só uma requisição é feita com o superconjunto
+      (partes de todos os consumidores pendentes + COMPANION_PARTS) e o
+      resultado é mesclado
+    - Memo LRU com TTL por processo + tabela title_documents (SQLite) entre
+      processos, ambos ignorados com o cache desativado (cache_enabled)
+    """
+
+    def __init__(self):
+        self.memo = OrderedDict()
+        self.locks = {}
+        self.lock = Lock()
+
+    @contextmanager
+    def _title_lock(self, key, parts):
+        # As partes são registradas antes de aguardar o lock: quem o obtiver
+        # busca a união das partes de todos os consumidores pendentes
+        with self.lock:
+            holder = self.locks.get(key)
+            if holder is None:
+                holder = self.locks[key] = {'lock': Lock(), 'users': 0, 'parts': set()}
+            holder['users'] += 1
+            holder['parts'] |= parts
+
+        try:
+            with holder['lock']:
+                yield holder
+        finally:
+            with self.lock:
+                holder['users'] -= 1
+                if not holder['users']:
+                    del self.locks[key]
+
+    def _load(self, key):
+        if not CACHE_ENABLED:
+            return None
+
+        with self.lock:
+            entry = self.memo.get(key)
+            if entry is not None:
+                if time.time() - entry['time'] < TITLE_MEMO_TTL:
+                    self.memo.move_to_end(key)
+                    return entry
+                del self.memo[key]
+
+        data, parts = get_cache_manager().get_title_document(*key)
+        if not data:
+            return None
+
+        # Documentos de uma versão anterior da poda são atualizados (ou descartados)
+        version = data.get(TMDB_SCHEMA_KEY)
+        data = tmdb_upgrade_payload(data, key[0])
+        if data is None:
+            return None
+
+        entry = {'data': data, 'parts': parts}
+        self._remember(key, entry)
+
+        if version != TMDB_SCHEMA_VERSION:
+            get_cache_manager().set_title_document(key[0], key[1], key[2], data, parts)
+
+        return entry
+
+    def _remember(self, key, entry):
+        if not CACHE_ENABLED:
+            return
+
+        entry['time'] = time.time()
+
+        with self.lock:
+            self.memo[key] = entry
+            self.memo.move_to_end(key)
+            while len(self.memo) > TITLE_MEMO_SIZE:
+                self.memo.popitem(last=False)
+
+    def warm(self, limit=1):
+        """Carrega no memo os documentos usados mais recentemente"""
+        if not CACHE_ENABLED:
+            return
+
+        for key, data, parts in get_cache_manager().get_recent_title_documents(limit):
+            if data.get(TMDB_SCHEMA_KEY) == TMDB_SCHEMA_VERSION:
+                self._remember(key, {'data': data, 'parts': parts})
+
+    def get(self, media_type, tmdb_id, consumers, language=DEFAULT_LANGUAGE):
+        """
+        Retorna a projeção do documento do título com todas as partes dos consumidores.
+
+        Args:
+            media_type: 'movie' ou 'tv'
+            tmdb_id: TMDB ID
+            consumers: Nome (ou lista de nomes) em CONSUMER_PARTS
+            language: Idioma da requisição
+
+        Returns:
+            Cópia da projeção (campos de CONSUMER_FIELDS) ou do documento inteiro,
+            ou None. É uma cópia porque os consumidores alteram os itens (label2, job...).
+        """
+        if isinstance(consumers, str):
+            consumers = [consumers]
+
+        fields = None
+        if all(consumer in CONSUMER_FIELDS for consumer in consumers):
+            fields = set(field for consumer in consumers for field in CONSUMER_FIELDS[consumer])
+
+        valid = MEDIA_PARTS[media_type]
+        needed = set(part for consumer in consumers for part in CONSUMER_PARTS.get(consumer, ()) if part in valid)
+
+        key = (media_type, str(tmdb_id), title_locale(language))
+
+        with self._title_lock(key, needed) as holder:
+            entry = self._load(key)
+
+            if entry and needed <= entry['parts']:
+                return self._project(entry['data'], fields)
+
+            with self.lock:
+                pending = set(holder['parts'])
+
+            have = entry['parts'] if entry else set()
+            missing = (needed | pending | set(part for part in COMPANION_PARTS if part in valid)) - have
+
+            data = self._fetch(media_type, tmdb_id, missing, language)
+            if not data:
+                return self._project(entry['data'], fields) if entry else None
+
+            # Poda antes de mesclar/persistir: só os campos que os builders leem
+            data = tmdb_trim_payload(data, media_type)
+
+            if entry:
+                entry['data'].update(data)
+                entry['parts'] |= missing
+            else:
+                entry = {'data': data, 'parts': set(missing)}
+
+            self._remember(key, entry)
+
+            if CACHE_ENABLED:
+                get_cache_manager().set_title_document(key[0], key[1], key[2], entry['data'], entry['parts'])
+
+            return self._project(entry['data'], fields)
+
+    def _project(self, data, fields):
+        if fields is None:
+            return copy.deepcopy(data)
+
+        return copy.deepcopy(dict((field, data[field]) for field in fields if field in data))
+
+    def _fetch(self, media_type, tmdb_id, parts, language):
+        params = {'append_to_response': ','.join(sorted(parts))}
+
+        if 'images' in parts:
+            params['include_image_language'] = '%s,en,null' % language
+
+        xbmc.log('[script.embuary.info] AppendPlanner: %s %s -> %s' % (media_type, tmdb_id, params['append_to_response']), xbmc.LOGDEBUG)
+
+        return tmdb_query(action=media_type,
+                          call=tmdb_id,
+                          params=params,
+                          language=language,
+                          show_error=False
+                          )
+
+########################
+
+# Instância global
+_planner = None
+_planner_lock = Lock()
+
+def get_append_planner():
+    """Retorna instância singleton do planner"""
+    global _planner
+    if _planner is None:
+        with _planner_lock:
+            if _planner is None:
+                _planner = AppendPlanner()
+    return _planner
+
+
+def tmdb_get_title(media_type, tmdb_id, consumers, language=DEFAULT_LANGUAGE):
+    return get_append_planner().get(media_type, tmdb_id, consumers, language)
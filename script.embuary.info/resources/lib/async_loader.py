@@ -155,21 +155,17 @@ class CastAsyncLoader:
         Args:
             tmdb_id: TMDB ID
             media_type: Tipo de mídia ('movie' ou 'tv')
-            cache_manager: Instância do CastCacheManager
+            cache_manager: Não usado (o cache é o documento do título), mantido por compatibilidade
             
         Returns:
             Lista de dados do cast ou None
         """
-        from resources.lib.tmdb import tmdb_query
+        from resources.lib.append_planner import tmdb_get_title
         
         try:
-            # Busca dados do TMDB
-            data = tmdb_query(
-                action='movie' if media_type == 'movie' else 'tv',
-                call=tmdb_id,
-                params={'append_to_response': 'credits'},
-                show_error=False
-            )
+            # Projeção do documento do título (já é o cache persistente; não há
+            # mais cópia separada do cast em cast_cache)
+            data = tmdb_get_title('movie' if media_type == 'movie' else 'tv', tmdb_id, 'preload')
             
             if not data:
                 return None
@@ -185,10 +181,6 @@ class CastAsyncLoader:
             ]
             cast_data = acting_cast[:10]
             
-            # Salva no cache
-            cache_key = 'cast_%s_%s' % (media_type, tmdb_id)
-            cache_manager.set(cache_key, cast_data)
-            
             xbmc.log('[script.embuary.info] Preloaded cast for %s ID: %s (%d actors)' % 
                      (media_type, tmdb_id, len(cast_data)), xbmc.LOGDEBUG)
             
@@ -205,27 +197,13 @@ class CastAsyncLoader:
         Args:
             tmdb_id: TMDB ID
             media_type: Tipo de mídia ('movie' ou 'tv')
-            cache_manager: Instância do CastCacheManager
+            cache_manager: Não usado (o cache é o documento do título), mantido por compatibilidade
             
         Returns:
             Lista de dados do cast
         """
-        # Tenta cache primeiro
-        cache_key = 'cast_%s_%s' % (media_type, tmdb_id)
-        cached_data = cache_manager.get(cache_key)
-        
-        if cached_data:
-            xbmc.log('[script.embuary.info] ✓ Cast cache HIT for %s (%d actors)' % (cache_key, len(cached_data)), xbmc.LOGINFO)
-            return cached_data
-        
-        # Cache miss - carrega do TMDB
-        xbmc.log('[script.embuary.info] ✗ Cast cache MISS for %s - Loading from TMDB...' % cache_key, xbmc.LOGINFO)
-        result = self.preload_cast_data(tmdb_id, media_type, cache_manager)
-        
-        if result:
-            xbmc.log('[script.embuary.info] ✓ Cast loaded and SAVED to cache: %s (%d actors)' % (cache_key, len(result)), xbmc.LOGINFO)
-        
-        return result
+        # O documento do título é o cache: o planner só vai ao TMDB em caso de miss
+        return self.preload_cast_data(tmdb_id, media_type, cache_manager)
     
     def shutdown(self):
         """Shutdown gracioso - aguarda workers finalizarem"""
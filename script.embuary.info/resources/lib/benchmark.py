@@ -0,0 +1,219 @@
+#!/usr/bin/python
+# coding: utf-8
+
+########################
+
+import xbmc
+import copy
+import json
+import time
+import random
+import datetime
+
+from resources.lib.helper import *
+from resources.lib.tmdb import tmdb_index_translations, tmdb_trim_payload
+from resources.lib.nextaired import LibraryIndex
+
+########################
+
+''' Micro benchmarks for hot paths. Run them with RunScript(script.embuary.info,mode=benchmark)
+    and check the results in the text viewer or in kodi.log.
+'''
+
+########################
+
+def run_benchmarks():
+    report = []
+    report.extend(benchmark_dates())
+    report.extend(benchmark_payloads())
+    report.extend(benchmark_nextaired())
+
+    for line in report:
+        log(line, force=True)
+
+    return '[CR]'.join(report)
+
+
+def _timeit(func, values, rounds=3):
+    ''' Returns the first (cold) and the best (warm) round in seconds.
+    '''
+    timings = []
+    for i in range(rounds):
+        start = time.perf_counter()
+        for value in values:
+            func(value)
+        timings.append(time.perf_counter() - start)
+    return timings[0], min(timings)
+
+
+def _compare(label, legacy, current, values):
+    clear_date_caches()
+    legacy_cold, legacy_time = _timeit(legacy, values)
+    current_cold, current_time = _timeit(current, values)
+    speedup_cold = legacy_cold / current_cold if current_cold else 0
+    speedup = legacy_time / current_time if current_time else 0
+
+    return '%s: arrow %.1f ms cold, %.1f ms warm / current %.1f ms cold, %.1f ms warm (%d calls, %.1fx cold, %.1fx warm)' % (label, legacy_cold * 1000, legacy_time * 1000, current_cold * 1000, current_time * 1000, len(values), speedup_cold, speedup)
+
+
+''' Previous arrow based implementations, kept here as the baseline.
+'''
+def _legacy_date_format(value,date='short'):
+    try:
+        return arrow.get(value).strftime(xbmc.getRegion('date%s' % date))
+    except Exception:
+        return value
+
+
+def _legacy_date_year(value):
+    return str(arrow.get(value).year)
+
+
+def _legacy_date_delta(date):
+    return arrow.get(date, 'YYYY-MM-DD').date() - datetime.date.today()
+
+
+def _legacy_date_weekday(date):
+    weekdays = [xbmc.getLocalizedString(i) for i in range(11, 18)]
+    weekday = arrow.get(date).date().weekday()
+    return weekdays[weekday], weekday
+
+
+def _legacy_utc_to_local(value):
+    conv_date = arrow.get(value).to(TIMEZONE)
+    conv_date_str = conv_date.strftime('%Y-%m-%d')
+
+    if xbmc.getRegion('time').startswith('%I'):
+        conv_time_str = conv_date.strftime('%I:%M %p')
+    else:
+        conv_time_str = conv_date.strftime('%H:%M')
+
+    return conv_date_str, conv_time_str
+
+
+def benchmark_dates(count=2000):
+    ''' Synthetic filmography: release dates of a prolific actor (many repeated years/dates)
+        plus a week of Trakt calendar timestamps.
+    '''
+    rnd = random.Random(42)
+    dates = ['%04d-%02d-%02d' % (rnd.randint(1950, 2030), rnd.randint(1, 12), rnd.randint(1, 28)) for i in range(count)]
+    aired = ['2024-05-%02dT%02d:%02d:00.000Z' % (rnd.randint(1, 7), rnd.randint(0, 23), rnd.choice([0, 15, 30, 45])) for i in range(count)]
+
+    return [
+        _compare('date_format', _legacy_date_format, date_format, dates),
+        _compare('date_year', _legacy_date_year, date_year, dates),
+        _compare('date_delta', _legacy_date_delta, date_delta, dates),
+        _compare('date_weekday', _legacy_date_weekday, date_weekday, dates),
+        _compare('utc_to_local', _legacy_utc_to_local, utc_to_local, aired)
+    ]
+
+
+def _synthetic_movie(rnd):
+    ''' Roughly the shape and size of a popular movie with the full append_to_response set.
+    '''
+    person = lambda i, **kwargs: dict({'adult': False, 'gender': rnd.randint(0, 2), 'id': i, 'name': 'Person %d' % i, 'original_name': 'Person %d' % i,
+                                       'popularity': rnd.random() * 50, 'profile_path': '/p%d.jpg' % i, 'credit_id': '%024x' % i}, **kwargs)
+    image = lambda i, lang: {'aspect_ratio': 1.778, 'height': 2160, 'iso_639_1': lang, 'file_path': '/i%d.jpg' % i, 'vote_average': 5.3, 'vote_count': 4, 'width': 3840}
+    countries = ['AR', 'AU', 'BR', 'CA', 'DE', 'ES', 'FR', 'GB', 'IT', 'JP', 'KR', 'MX', 'NL', 'PT', 'RU', 'SE', 'US'] + ['C%d' % i for i in range(40)]
+    languages = ['en', 'pt', 'de', 'fr', 'es', 'it', 'ja', 'ko', 'zh', 'ru'] + ['l%d' % i for i in range(35)]
+
+    return {
+        'id': 1, 'title': 'Movie', 'original_title': 'Movie', 'overview': 'x' * 600, 'imdb_id': 'tt0000001', 'budget': 1, 'revenue': 1,
+        'credits': {'cast': [person(i, cast_id=i, character='Character %d' % i, order=i, known_for_department='Acting') for i in range(120)],
+                    'crew': [person(1000 + i, department=rnd.choice(['Art', 'Sound', 'Camera', 'Crew', 'Writing', 'Production', 'Directing']),
+                                    job=rnd.choice(['Grip', 'Foley', 'Gaffer', 'Writer', 'Producer', 'Director', 'Set Decoration']), known_for_department='Crew') for i in range(400)]},
+        'release_dates': {'results': [{'iso_3166_1': c, 'release_dates': [{'certification': '12', 'iso_639_1': '', 'note': '', 'release_date': '2020-01-01T00:00:00.000Z', 'type': t} for t in range(1, 5)]} for c in countries]},
+        'images': {'backdrops': [image(i, 'en') for i in range(150)], 'posters': [image(500 + i, 'pt') for i in range(80)], 'logos': [image(900 + i, 'en') for i in range(40)]},
+        'videos': {'results': [{'iso_639_1': 'en', 'iso_3166_1': 'US', 'name': 'Trailer %d' % i, 'key': 'k%08d' % i, 'site': 'YouTube', 'size': 1080, 'type': 'Trailer',
+                                'official': True, 'published_at': '2020-01-01T00:00:00.000Z', 'id': '%024x' % i} for i in range(40)]},
+        'similar': {'page': 1, 'total_pages': 500, 'total_results': 10000,
+                    'results': [{'adult': False, 'backdrop_path': '/b.jpg', 'genre_ids': [1, 2, 3], 'id': i, 'original_language': 'en', 'original_title': 'Similar %d' % i, 'overview': 'y' * 400,
+                                 'popularity': 10.0, 'poster_path': '/p.jpg', 'release_date': '2019-01-01', 'title': 'Similar %d' % i, 'video': False, 'vote_average': 7.1, 'vote_count': 900} for i in range(20)]},
+        'translations': {'translations': [{'iso_3166_1': 'XX', 'iso_639_1': lang, 'name': lang, 'english_name': lang,
+                                           'data': {'homepage': '', 'overview': 'z' * 500, 'runtime': 120, 'tagline': 'tag', 'title': 'Title ' + lang}} for lang in languages]}
+    }
+
+
+def benchmark_payloads(rounds=50):
+    ''' Cached size and decode time of a title document before (translations indexed only)
+        and after tmdb_trim_payload.
+    '''
+    item = _synthetic_movie(random.Random(42))
+    tmdb_index_translations(item)
+
+    before = json.dumps(item)
+    after = json.dumps(tmdb_trim_payload(copy.deepcopy(item), 'movie'))
+
+    before_cold, before_time = _timeit(json.loads, [before] * rounds)
+    after_cold, after_time = _timeit(json.loads, [after] * rounds)
+
+    return [
+        'title payload: %.1f KB -> %.1f KB (%.0f%% smaller)' % (len(before) / 1024.0, len(after) / 1024.0, 100 - len(after) * 100.0 / len(before)),
+        'title decode: %.2f ms -> %.2f ms per json.loads (%.1fx)' % (before_time * 1000 / rounds, after_time * 1000 / rounds, before_time / after_time if after_time else 0)
+    ]
+
+
+def _synthetic_library(rnd, count):
+    return [{'title': 'Show %d' % i, 'originaltitle': 'Original %d' % i, 'year': rnd.randint(1990, 2025), 'tmdbid': str(10000 + i) if rnd.random() > 0.2 else '',
+             'tvdbid': str(50000 + i) if rnd.random() > 0.3 else '', 'imdbnumber': 'tt%07d' % i if rnd.random() > 0.3 else '', 'art': {}} for i in range(count)]
+
+
+def _synthetic_calendar(rnd, library, count):
+    calendar = []
+    for i in range(count):
+        if rnd.random() < 0.1:
+            local = rnd.choice(library)
+            number = int(local['title'].split()[-1])
+            ids = {'tmdb': 10000 + number if rnd.random() > 0.5 else None, 'tvdb': 50000 + number if rnd.random() > 0.5 else None, 'imdb': None}
+            calendar.append({'title': local['title'], 'year': local['year'], 'ids': ids})
+        else:
+            calendar.append({'title': 'Other %d' % i, 'year': 2020, 'ids': {'tmdb': 900000 + i, 'tvdb': 900000 + i, 'imdb': 'tt9%06d' % i}})
+    return calendar
+
+
+def _legacy_nextaired_match(library, calendar):
+    local_media_data = [[item.get('tmdbid'), item.get('tvdbid'), item.get('imdbnumber'), item.get('art'), item.get('title'), item.get('originaltitle'), item.get('year')] for item in library]
+    matches = []
+
+    for show in calendar:
+        for i in local_media_data:
+            if str(show['ids']['tmdb']) == i[0] or str(show['ids']['tvdb']) == i[1] or str(show['ids']['imdb']) == i[2] or (show['title'] in [i[4], i[5]] and show['year'] == i[6]):
+                matches.append(i[4])
+                break
+
+    return matches
+
+
+def _indexed_nextaired_match(library, calendar):
+    index = LibraryIndex(library)
+    matches = []
+
+    for show in calendar:
+        local_show = index.match(show['ids']['tmdb'], show['ids']['tvdb'], show['ids']['imdb'], show['title'], show['year'])
+        if local_show:
+            matches.append(local_show['title'])
+
+    return matches
+
+
+def benchmark_nextaired(shows=5000, calendar=2000):
+    ''' Matching of the Trakt calendar against the library: nested loop vs. LibraryIndex
+        (index build included).
+    '''
+    rnd = random.Random(7)
+    library = _synthetic_library(rnd, shows)
+    items = _synthetic_calendar(rnd, library, calendar)
+
+    start = time.perf_counter()
+    legacy = _legacy_nextaired_match(library, items)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = _indexed_nextaired_match(library, items)
+    indexed_time = time.perf_counter() - start
+
+    return [
+        'nextaired match (%d shows, %d calendar items): loop %.1f ms / index %.1f ms (%.0fx, %d matches, %s)' % (shows, calendar, legacy_time * 1000, indexed_time * 1000,
+                                                                                                           legacy_time / indexed_time if indexed_time else 0, len(indexed),
+                                                                                                           'identical' if legacy == indexed else 'DIFFERENT')
+    ]
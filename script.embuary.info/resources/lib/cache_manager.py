@@ -18,6 +18,7 @@ ADDON_DATA_PATH = xbmcvfs.translatePath('special://profile/addon_data/script.emb
 DB_PATH = os.path.join(ADDON_DATA_PATH, 'cast_cache.db')
 CACHE_TTL_CAST = 90 * 24 * 60 * 60  # 90 dias
 CACHE_TTL_IMDB_MAP = 90 * 24 * 60 * 60  # 90 dias
+CACHE_TTL_TITLE = 14 * 24 * 60 * 60  # 14 dias
 
 ########################
 
@@ -94,6 +95,21 @@ class CastCacheManager:
             ''')
             
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_map_timestamp ON imdb_tmdb_map(timestamp)')
+
+            # Documento canônico por título (tipo, tmdb_id, idioma@país) e partes já buscadas
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS title_documents (
+                    media_type TEXT NOT NULL,
+                    tmdb_id TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    parts TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    timestamp INTEGER NOT NULL,
+                    PRIMARY KEY (media_type, tmdb_id, language)
+                )
+            ''')
+
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_title_timestamp ON title_documents(timestamp)')
             
             conn.commit()
             conn.close()
@@ -152,6 +168,12 @@ class CastCacheManager:
                         INSERT OR REPLACE INTO imdb_tmdb_map (imdb_id, tmdb_id, media_type, timestamp)
                         VALUES (?, ?, ?, ?)
                     ''', (data['imdb_id'], data['tmdb_id'], data['media_type'], data['timestamp']))
+
+                elif table == 'title_documents':
+                    cursor.execute('''
+                        INSERT OR REPLACE INTO title_documents (media_type, tmdb_id, language, parts, data, timestamp)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', (data['media_type'], data['tmdb_id'], data['language'], data['parts'], data['value'], data['timestamp']))
             
             conn.commit()
             conn.close()
@@ -270,6 +292,99 @@ class CastCacheManager:
             }
         })
     
+    def get_title_document(self, media_type, tmdb_id, language):
+        """
+        Busca o documento canônico de um título.
+
+        Args:
+            media_type: 'movie' ou 'tv'
+            tmdb_id: TMDB ID
+            language: Idioma e país do documento (title_locale)
+
+        Returns:
+            Tuple (data, parts) ou (None, None) se não encontrado/expirado
+        """
+        with self.db_lock:
+            conn = sqlite3.connect(DB_PATH)
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                SELECT parts, data, timestamp FROM title_documents
+                WHERE media_type = ? AND tmdb_id = ? AND language = ?
+            ''', (media_type, str(tmdb_id), language))
+
+            row = cursor.fetchone()
+            conn.close()
+
+        if not row or time.time() - row[2] > CACHE_TTL_TITLE:
+            return None, None
+
+        try:
+            return json.loads(row[1]), set(json.loads(row[0]))
+        except:
+            return None, None
+
+    def set_title_document(self, media_type, tmdb_id, language, data, parts):
+        """
+        Salva o documento canônico de um título (adiciona à fila).
+
+        Args:
+            media_type: 'movie' ou 'tv'
+            tmdb_id: TMDB ID
+            language: Idioma e país do documento (title_locale)
+            data: Documento (resposta do TMDB mesclada)
+            parts: Partes de append_to_response já buscadas
+        """
+        try:
+            self.write_queue.put({
+                'table': 'title_documents',
+                'data': {
+                    'media_type': media_type,
+                    'tmdb_id': str(tmdb_id),
+                    'language': language,
+                    'parts': json.dumps(sorted(parts)),
+                    'value': json.dumps(data, ensure_ascii=False),
+                    'timestamp': int(time.time())
+                }
+            })
+        except Exception as e:
+            xbmc.log('[script.embuary.info] Title document set error: %s' % str(e), xbmc.LOGERROR)
+
+    def get_recent_title_documents(self, limit=10):
+        """
+        Retorna os documentos de título mais recentes (warm-up).
+
+        Returns:
+            Lista de tuples ((media_type, tmdb_id, language), data, parts)
+        """
+        result = []
+
+        try:
+            with self.db_lock:
+                conn = sqlite3.connect(DB_PATH)
+                cursor = conn.cursor()
+
+                cursor.execute('''
+                    SELECT media_type, tmdb_id, language, parts, data FROM title_documents
+                    WHERE timestamp > ?
+                    ORDER BY timestamp DESC
+                    LIMIT ?
+                ''', (int(time.time()) - CACHE_TTL_TITLE, limit))
+
+                rows = cursor.fetchall()
+                conn.close()
+
+            for row in rows:
+                try:
+                    result.append(((row[0], row[1], row[2]), json.loads(row[4]), set(json.loads(row[3]))))
+                except:
+                    pass
+
+        except Exception as e:
+            xbmc.log('[script.embuary.info] get_recent_title_documents error: %s' % e, xbmc.LOGDEBUG)
+
+        return result
+
     def _delete_expired_cast(self, key):
         """Remove entrada expirada do cache de cast"""
         with self.db_lock:
@@ -296,6 +411,11 @@ class CastCacheManager:
             cursor.execute('''
                 DELETE FROM imdb_tmdb_map WHERE (? - timestamp) > ?
             ''', (current_time, CACHE_TTL_IMDB_MAP))
+
+            # Limpa documentos de título expirados
+            cursor.execute('''
+                DELETE FROM title_documents WHERE (? - timestamp) > ?
+            ''', (current_time, CACHE_TTL_TITLE))
             
             deleted = cursor.rowcount
             conn.commit()
@@ -147,6 +147,7 @@ def get_movie_cast_from_player():
         
         # Buscar no TMDB pelo IMDB ID ou título
         from resources.lib.tmdb import tmdb_query
+        from resources.lib.append_planner import tmdb_get_title
         
         movie_details = None
         
@@ -159,11 +160,7 @@ def get_movie_cast_from_player():
             )
             if find_result and find_result.get('movie_results'):
                 tmdb_id = find_result['movie_results'][0]['id']
-                movie_details = tmdb_query(
-                    action='movie',
-                    call=str(tmdb_id),
-                    params={'append_to_response': 'credits', 'language': 'pt-BR'}
-                )
+                movie_details = tmdb_get_title('movie', tmdb_id, 'bios', language='pt-BR')
         
         if not movie_details and title:
             # Busca por título
@@ -174,11 +171,7 @@ def get_movie_cast_from_player():
             )
             if search_result and search_result.get('results'):
                 tmdb_id = search_result['results'][0]['id']
-                movie_details = tmdb_query(
-                    action='movie',
-                    call=str(tmdb_id),
-                    params={'append_to_response': 'credits', 'language': 'pt-BR'}
-                )
+                movie_details = tmdb_get_title('movie', tmdb_id, 'bios', language='pt-BR')
         
         if not movie_details:
             return []
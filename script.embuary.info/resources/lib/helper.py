@@ -17,6 +17,7 @@ import sys
 import simplecache
 import hashlib
 import atexit
+import functools
 
 ########################
 
@@ -178,35 +179,102 @@ def winprop(key,value=None,clear=False,window_id=10000):
 
         return result
 
+########################
+
+''' Date and locale formatting layer. Region formats and weekday names are read from
+    Kodi once per process, ISO dates are parsed without arrow and formatted results
+    are memoized, because these helpers run once per item in long lists.
+'''
+
+_REGION_FORMATS = {}
+_WEEKDAY_NAMES = []
+
+
+def region_format(key):
+    value = _REGION_FORMATS.get(key)
+    if value is None:
+        value = _REGION_FORMATS[key] = xbmc.getRegion(key)
+    return value
+
+
+def weekday_names():
+    if not _WEEKDAY_NAMES:
+        _WEEKDAY_NAMES.extend([xbmc.getLocalizedString(i) for i in range(11, 18)])
+    return _WEEKDAY_NAMES
+
+
+def _is_iso_date(value):
+    return (len(value) >= 10 and value[4] == '-' and value[7] == '-'
+            and value[:4].isdigit() and value[5:7].isdigit() and value[8:10].isdigit()
+            and (len(value) == 10 or value[10] in 'T '))
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date_str(value):
+    if _is_iso_date(value):
+        return datetime.date(int(value[:4]), int(value[5:7]), int(value[8:10]))
+    return arrow.get(value).date()
+
+
+def parse_date(value):
+    ''' Returns a datetime.date for ISO strings (fast path), arrow/datetime objects
+        or anything else arrow can parse.
+    '''
+    if isinstance(value, str):
+        return _parse_date_str(value)
+    if isinstance(value, datetime.datetime) or hasattr(value, 'naive'):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return arrow.get(value).date()
+
+
+def clear_date_caches():
+    _REGION_FORMATS.clear()
+    del _WEEKDAY_NAMES[:]
+    for cached in (_parse_date_str, _date_year, _date_format, _utc_to_local):
+        cached.cache_clear()
+
+
 def date_year(value):
     if not value:
         return value
 
     try:
-        year = str(arrow.get(value).year)
-
+        return _date_year(value) if isinstance(value, str) else str(parse_date(value).year)
     except Exception:
-        pass
+        return ''
+
+
+@functools.lru_cache(maxsize=4096)
+def _date_year(value):
+    if _is_iso_date(value):
+        return value[:4]
+    return str(arrow.get(value).year)
 
-    return year
-    
-def date_format(value,date='short'):
+
+def date_format(value,date='short',scheme=None):
     if not value:
         return value
 
     try:
-        date_time = arrow.get(value)
-        value = date_time.strftime(xbmc.getRegion('date%s' % date))
-
+        return _date_format(value, region_format('date%s' % date), scheme)
     except Exception:
-        pass
+        return value
 
-    return value
+
+@functools.lru_cache(maxsize=4096)
+def _date_format(value,region,scheme):
+    if scheme:
+        date_obj = arrow.get(value, scheme).date()
+    else:
+        date_obj = parse_date(value)
+
+    return date_obj.strftime(region)
 
 
 def date_delta(date):
-    date = arrow.get(date, 'YYYY-MM-DD').date()
-    return date - datetime.date.today()
+    return parse_date(date) - datetime.date.today()
 
 
 def date_weekday(date=None):
@@ -215,26 +283,40 @@ def date_weekday(date=None):
         date = utc.to(TIMEZONE).date()
 
     try:
-        weekdays = (xbmc.getLocalizedString(11), xbmc.getLocalizedString(12), xbmc.getLocalizedString(13), xbmc.getLocalizedString(14), xbmc.getLocalizedString(15), xbmc.getLocalizedString(16), xbmc.getLocalizedString(17))
-        date = arrow.get(date).date()
-        weekday = date.weekday()
-        return weekdays[weekday], weekday
+        weekday = parse_date(date).weekday()
+        return weekday_names()[weekday], weekday
 
     except Exception:
         return '', ''
 
 
 def utc_to_local(value):
-    conv_date = arrow.get(value).to(TIMEZONE)
+    return _utc_to_local(value, region_format('time').startswith('%I'))
+
+
+@functools.lru_cache(maxsize=4096)
+def _utc_to_local(value,use_12h):
+    conv_date = None
+
+    if TIMEZONE == 'local':
+        try:
+            conv_date = datetime.datetime.fromisoformat(value.replace('Z', '+00:00')).astimezone()
+        except Exception:
+            conv_date = None
+
+    if conv_date is None:
+        conv_date = arrow.get(value).to(TIMEZONE)
+
     conv_date_str = conv_date.strftime('%Y-%m-%d')
 
-    if xbmc.getRegion('time').startswith('%I'):
+    if use_12h:
         conv_time_str = conv_date.strftime('%I:%M %p')
     else:
         conv_time_str = conv_date.strftime('%H:%M')
 
     return conv_date_str, conv_time_str
 
+########################
 
 def get_bool(value,string='true'):
     try:
@@ -5,16 +5,106 @@
 
 import json
 import sys
+import zlib
 import requests
 
 from resources.lib.helper import *
+from resources.lib.tasks import get_task_pool
 
 ########################
 
+LOCAL_MEDIA_TIMEOUT = 60
+
+########################
+
+class LocalMediaLoader(object):
+    ''' Loads the local library in the background. The TMDB requests (and the ID resolution)
+        run meanwhile, only the local match of the builders waits for it.
+    '''
+    def __init__(self):
+        self.future = get_task_pool().submit(get_local_media)
+
+    def result(self):
+        try:
+            return self.future.result(timeout=LOCAL_MEDIA_TIMEOUT) or {}
+        except Exception as error:
+            log('Local media cannot be loaded. Error --> %s' % error, ERROR)
+            return {}
+
+    def items(self,key):
+        return LocalItems(self, key)
+
+
+class LocalItems(object):
+    ''' Local movies or shows of a LocalMediaLoader. Behaves like the list returned by
+        get_local_media() and only blocks when it is iterated for the first time.
+    '''
+    def __init__(self,loader,key):
+        self.loader = loader
+        self.key = key
+
+    def _items(self):
+        return self.loader.result().get(self.key) or []
+
+    def __iter__(self):
+        return iter(self._items())
+
+    def __len__(self):
+        return len(self._items())
+
+
+class LibraryFingerprint(object):
+    ''' Fingerprint of a library snapshot: number of items, highest dbid and an order
+        independent rolling hash (XOR) of the IDs, titles and years that the local matching
+        uses. New items are added without hashing the whole library again, and playcounts or
+        art don't change it. The occurrence of an item is part of its hash, so duplicate
+        entries don't cancel each other out.
+    '''
+    def __init__(self,items=None):
+        self.count = 0
+        self.max_dbid = 0
+        self.rolling = 0
+        self.occurrences = {}
+
+        for item in items or []:
+            self.add(item)
+
+    def add(self,item):
+        key = '|'.join(str(item.get(field, '')) for field in ('dbid', 'tmdbid', 'tvdbid', 'imdbnumber', 'title', 'originaltitle', 'year'))
+        occurrence = self.occurrences[key] = self.occurrences.get(key, 0) + 1
+
+        self.count += 1
+        self.rolling ^= zlib.crc32(('%s#%d' % (key, occurrence)).encode())
+
+        try:
+            self.max_dbid = max(self.max_dbid, int(item.get('dbid') or 0))
+        except ValueError:
+            pass
+
+    @property
+    def value(self):
+        return '%d-%d-%08x' % (self.count, self.max_dbid, self.rolling)
+
+
+def library_fingerprint(local_media,key):
+    ''' Fingerprint of the local movies or shows. Computed once when the snapshot is built
+        and kept in it, so reading it is O(1). The snapshot is shared (cache, dialogs,
+        widgets) and never modified afterwards.
+    '''
+    fingerprint = (local_media.get('fingerprints') or {}).get(key)
+
+    if fingerprint is None:
+        fingerprint = LibraryFingerprint(local_media.get(key)).value
+
+    return fingerprint
+
+
 def get_local_media(force=False):
     local_media = get_cache('local_db')
 
-    if not local_media or force:
+    ''' Snapshots from before the fingerprints were added are built again.
+    '''
+    if not local_media or force or 'fingerprints' not in local_media:
         local_media = {}
         local_media['shows'] = query_local_media('tvshow',
                                                 get='VideoLibrary.GetTVShows',
@@ -25,6 +115,9 @@ def get_local_media(force=False):
                                                 properties=['title', 'originaltitle', 'year', 'uniqueid', 'playcount', 'file', 'art']
                                                 )
 
+        local_media['fingerprints'] = {'shows': LibraryFingerprint(local_media['shows']).value,
+                                       'movies': LibraryFingerprint(local_media['movies']).value}
+
         if local_media:
             write_cache('local_db', local_media, 24)
 
@@ -6,6 +6,8 @@
 import sys
 import xbmc
 import xbmcgui
+from threading import Thread, Event, Lock
+from collections import OrderedDict, deque
 
 from resources.lib.helper import *
 from resources.lib.tmdb import *
@@ -13,6 +15,40 @@ from resources.lib.person import *
 from resources.lib.video import *
 from resources.lib.season import *
 from resources.lib.localdb import *
+from resources.lib.models import MediaItem, models_to_dicts, models_from_dicts
+from resources.lib.tasks import LazyResult, get_prefetch_pool
+from resources.lib.append_planner import tmdb_get_title
+
+########################
+
+# Dialogs mantidos vivos no histórico; os mais antigos viram snapshots
+DIALOG_HISTORY_SIZE = 4
+
+# Itens por addItems() ao adicionar as páginas restantes de um container
+FILL_CHUNK_SIZE = 50
+
+# Pré-carregamento do item focado: espera o foco parar por este tempo (s)
+PREFETCH_DEBOUNCE = 0.6
+PREFETCH_LOCK = Lock()
+
+# Itens já pré-carregados (LRU): não são pedidos de novo enquanto o cache vale
+PREFETCHED = OrderedDict()
+PREFETCHED_LOCK = Lock()
+PREFETCHED_SIZE = 500
+PREFETCHED_TTL = 60 * 60
+
+# Temporadas são pré-carregadas uma de cada vez (cada uma são até 3 requisições),
+# por uma única tarefa que esvazia a fila
+SEASON_PREFETCH_QUEUE = deque()
+SEASON_PREFETCH_LOCK = Lock()
+SEASON_PREFETCH_RUNNING = False
+
+########################
+
+def request_key(call,tmdb_id,season=None):
+    ''' Key of a dialog in the history, the dialog cache and the prefetch set.
+    '''
+    return call + str(tmdb_id) + str(season or '')
 
 ########################
 
@@ -20,7 +56,8 @@ class TheMovieDB(object):
     def __init__(self,call,params):
         self.monitor = xbmc.Monitor()
         self.window_stack = []
-        self.dialog_cache = {}
+        self.dialog_cache = OrderedDict()
+        self.dialog_snapshots = {}
         self.call = call
         self.tmdb_id = params.get('tmdb_id')
         self.season = params.get('season')
@@ -38,6 +75,10 @@ class TheMovieDB(object):
         winprop('script.embuary.info-language_code', DEFAULT_LANGUAGE)
         winprop('script.embuary.info-country_code', COUNTRY_CODE)
 
+        ''' The library is loaded while the ID is resolved and TMDB is queried.
+        '''
+        local_media = LocalMediaLoader()
+
         busydialog()
 
         if self.dbid and self.dbtype:
@@ -49,10 +90,8 @@ class TheMovieDB(object):
 
         if self.tmdb_id:
             self.call_params = {}
-
-            local_media = get_local_media()
-            self.call_params['local_shows'] = local_media['shows']
-            self.call_params['local_movies'] = local_media['movies']
+            self.call_params['local_shows'] = local_media.items('shows')
+            self.call_params['local_movies'] = local_media.items('movies')
 
             self.entry_point()
 
@@ -154,7 +193,7 @@ class TheMovieDB(object):
         self.call_params['call'] = self.call
         self.call_params['tmdb_id'] = self.tmdb_id
         self.call_params['season'] = self.season
-        self.request = self.call + str(self.tmdb_id)
+        self.request = request_key(self.call, self.tmdb_id, self.season)
 
         busydialog()
 
@@ -170,8 +209,9 @@ class TheMovieDB(object):
         ''' Open next dialog if information has been found. If not open the previous dialog again.
         '''
         if dialog:
-            self.dialog_cache[self.request] = dialog
-            self.dialog_manager(dialog)
+            self.remember_dialog(self.request, dialog)
+            del dialog
+            self.dialog_manager(self.request)
 
         elif self.window_stack:
             self.dialog_history()
@@ -185,11 +225,7 @@ class TheMovieDB(object):
             return
 
         dialog = DialogPerson('script-embuary-person.xml', ADDON_PATH, 'default', '1080i',
-                              person=data['person'],
-                              movies=data['movies'],
-                              tvshows=data['tvshows'],
-                              combined=data['combined'],
-                              images=data['images'],
+                              sections=data.result,
                               tmdb_id=self.tmdb_id
                               )
         return dialog
@@ -200,15 +236,7 @@ class TheMovieDB(object):
             return
 
         dialog = DialogVideo('script-embuary-video.xml', ADDON_PATH, 'default', '1080i',
-                             details=data['details'],
-                             cast=data['cast'],
-                             crew=data['crew'],
-                             similar=data['similar'],
-                             youtube=data['youtube'],
-                             backdrops=data['backdrops'],
-                             posters=data['posters'],
-                             collection=data['collection'],
-                             seasons=data['seasons'],
+                             sections=data.result,
                              tmdb_id=self.tmdb_id
                              )
         return dialog
@@ -223,6 +251,7 @@ class TheMovieDB(object):
                               cast=data['cast'],
                               gueststars=data['gueststars'],
                               posters=data['posters'],
+                              adjacent=data['adjacent'],
                               tmdb_id=self.tmdb_id
                               )
         return dialog
@@ -230,21 +259,28 @@ class TheMovieDB(object):
 
     ''' Dialog handler. Creates the window history, reopens dialogs from a stack
         or cache and is responsible for keeping the script alive.
+        The history only holds request keys, the dialogs are resolved by get_dialog().
     '''
-    def dialog_manager(self,dialog):
+    def dialog_manager(self,request):
+        dialog = self.get_dialog(request)
+        if not dialog:
+            self.dialog_history()
+            return
+
         dialog.doModal()
 
         try:
             next_id = dialog['id']
             next_call = dialog['call']
             next_season = dialog['season']
+            del dialog
 
             if next_call == 'youtube':
                 while condition('Player.HasMedia | Window.IsVisible(busydialog) | Window.IsVisible(busydialognocancel) | Window.IsVisible(okdialog)') and not self.monitor.abortRequested():
                     self.monitor.waitForAbort(1)
 
                 # reopen dialog after playback ended
-                self.dialog_manager(dialog)
+                self.dialog_manager(request)
 
             if next_call == 'back':
                 self.dialog_history()
@@ -255,15 +291,14 @@ class TheMovieDB(object):
             if not next_id or not next_call:
                 raise Exception
 
-            self.window_stack.append(dialog)
+            self.window_stack.append(request)
             self.tmdb_id = next_id
             self.call = next_call
             self.season = next_season
-            self.request = next_call + str(next_id) + str(next_season)
+            self.request = request_key(next_call, next_id, next_season)
 
-            if self.dialog_cache.get(self.request):
-                dialog = self.dialog_cache[self.request]
-                self.dialog_manager(dialog)
+            if self.request in self.dialog_cache or self.request in self.dialog_snapshots:
+                self.dialog_manager(self.request)
             else:
                 self.entry_point()
 
@@ -272,31 +307,364 @@ class TheMovieDB(object):
 
     def dialog_history(self):
         if self.window_stack:
-            dialog = self.window_stack.pop()
-            self.dialog_manager(dialog)
+            request = self.window_stack.pop()
+            self.dialog_manager(request)
         else:
             self.quit()
 
+    ''' LRU of live dialogs. Only the last DIALOG_HISTORY_SIZE dialogs keep their window and
+        ListItems, older ones are reduced to a snapshot of their sections (plain dicts) and
+        rebuilt without any network request when the user navigates back to them.
+    '''
+    def remember_dialog(self,request,dialog):
+        self.dialog_cache[request] = dialog
+        self.dialog_cache.move_to_end(request)
+        self.dialog_snapshots.pop(request, None)
+
+        while len(self.dialog_cache) > DIALOG_HISTORY_SIZE:
+            old_request, old_dialog = self.dialog_cache.popitem(last=False)
+            self.dialog_snapshots[old_request] = old_dialog.snapshot()
+            del old_dialog
+
+    def get_dialog(self,request):
+        dialog = self.dialog_cache.get(request)
+        if dialog:
+            self.dialog_cache.move_to_end(request)
+            return dialog
+
+        snapshot = self.dialog_snapshots.get(request)
+        if snapshot:
+            dialog = restore_dialog(snapshot, self.call_params)
+            self.remember_dialog(request, dialog)
+            return dialog
+
     def quit(self):
         del self.call_params
         del self.window_stack
         del self.dialog_cache
+        del self.dialog_snapshots
         quit()
 
 
+''' Dialog snapshots: the built sections of a dialog as plain dicts (models.to_dict).
+'''
+def snapshot_sections(sections,keys):
+    snapshot = {}
+
+    for key in keys:
+        if isinstance(sections, LazyResult) and not sections.is_built(key):
+            continue
+
+        items = sections[key] or []
+        snapshot[key] = models_to_dicts([item for item in items if isinstance(item, MediaItem)])
+
+    return snapshot
+
+
+def restore_dialog(snapshot,call_params):
+    sections = dict((key, models_from_dicts(items)) for key, items in snapshot['sections'].items())
+
+    if snapshot['dialog'] == 'season':
+        return DialogSeason('script-embuary-video.xml', ADDON_PATH, 'default', '1080i',
+                            tmdb_id=snapshot['tmdb_id'],
+                            adjacent=snapshot.get('adjacent'),
+                            **sections
+                            )
+
+    result = LazyResult()
+    for key, items in sections.items():
+        result[key] = items
+
+    ''' Sections that were not built are built from a new request on first access. The
+        title and person documents are usually cached by then.
+    '''
+    pending = snapshot.get('pending')
+    if pending:
+        call_request = dict(call_params, call=snapshot['call'], tmdb_id=snapshot['tmdb_id'], season=None)
+        source = TMDBPersons if snapshot['dialog'] == 'person' else TMDBVideos
+
+        result.add('source', lambda: source(call_request).result)
+        for key in pending:
+            result.add(key, lambda key=key: result['source'].get(key))
+
+    if snapshot['dialog'] == 'person':
+        return DialogPerson('script-embuary-person.xml', ADDON_PATH, 'default', '1080i',
+                            sections=result,
+                            tmdb_id=snapshot['tmdb_id']
+                            )
+
+    return DialogVideo('script-embuary-video.xml', ADDON_PATH, 'default', '1080i',
+                       sections=result,
+                       tmdb_id=snapshot['tmdb_id']
+                       )
+
+
+''' Speculative prefetch. The dialogs watch the focused item of their person/title/season
+    containers and, once the focus settles, load it into the cache on the low priority pool.
+    Clicking through to the next dialog is then usually a cache hit.
+'''
+def claim_prefetch(key):
+    ''' True if the item was not prefetched within PREFETCHED_TTL. Call with PREFETCHED_LOCK.
+    '''
+    now = time.time()
+    prefetched = PREFETCHED.get(key)
+    if prefetched and now - prefetched < PREFETCHED_TTL:
+        return False
+
+    PREFETCHED[key] = now
+    PREFETCHED.move_to_end(key)
+    while len(PREFETCHED) > PREFETCHED_SIZE:
+        PREFETCHED.popitem(last=False)
+
+    return True
+
+
+def prefetch_request(call,tmdb_id,season=''):
+    with PREFETCHED_LOCK:
+        if not claim_prefetch(request_key(call, tmdb_id, season)):
+            return
+
+    get_prefetch_pool().submit(_prefetch, call, tmdb_id, season)
+
+
+def prefetch_seasons(tmdb_id,seasons):
+    ''' Seasons of one show, prefetched one after another by a single pool task.
+    '''
+    pending = []
+
+    with PREFETCHED_LOCK:
+        for season in seasons:
+            if claim_prefetch(request_key('tv', tmdb_id, season)):
+                pending.append(season)
+
+    if pending:
+        queue_season_prefetch(tmdb_id, pending)
+
+
+def queue_season_prefetch(tmdb_id,seasons):
+    ''' Seasons are queued and prefetched one after another by a single pool task, so a
+        season requested while another one is loading is not lost and doesn't hold a worker.
+    '''
+    global SEASON_PREFETCH_RUNNING
+
+    with SEASON_PREFETCH_LOCK:
+        SEASON_PREFETCH_QUEUE.extend((tmdb_id, season) for season in seasons)
+        if SEASON_PREFETCH_RUNNING:
+            return
+        SEASON_PREFETCH_RUNNING = True
+
+    get_prefetch_pool().submit(_prefetch_season_queue)
+
+
+def _prefetch_season_queue():
+    global SEASON_PREFETCH_RUNNING
+
+    while True:
+        with SEASON_PREFETCH_LOCK:
+            if not SEASON_PREFETCH_QUEUE:
+                SEASON_PREFETCH_RUNNING = False
+                return
+            tmdb_id, season = SEASON_PREFETCH_QUEUE.popleft()
+
+        log('Prefetching season %s of tv %s' % (season, tmdb_id), DEBUG)
+
+        try:
+            _prefetch_season(tmdb_id, season)
+        except Exception as error:
+            log('Season %s of tv %s cannot be prefetched. Error --> %s' % (season, tmdb_id, error), DEBUG)
+
+
+def _prefetch(call,tmdb_id,season):
+    log('Prefetching %s %s %s' % (call, tmdb_id, season), DEBUG)
+
+    if call == 'person':
+        tmdb_prefetch_person(tmdb_id)
+
+    elif call == 'tv' and season:
+        queue_season_prefetch(tmdb_id, [season])
+
+    elif call in ['movie','tv']:
+        tmdb_get_title(call, tmdb_id, 'full')
+
+
+def _prefetch_season(tmdb_id,season):
+    ''' Everything TMDBSeasons needs.
+    '''
+    tmdb_get_season(tmdb_id, season, show_error=False)
+    tmdb_get_season_images(tmdb_id, season)
+    tmdb_get_title('tv', tmdb_id, 'header')
+
+
+''' One debounce thread per dialog. Actions (including mouse moves) only push its deadline
+    back, the thread prefetches the focused item once the deadline has passed.
+'''
+class FocusPrefetch(object):
+    PREFETCH_CONTAINERS = ()
+    prefetch_thread = None
+    prefetch_deadline = 0
+    prefetch_cancel = None
+
+    def schedule_prefetch(self):
+        with PREFETCH_LOCK:
+            self.prefetch_deadline = time.monotonic() + PREFETCH_DEBOUNCE
+
+            if self.prefetch_thread is None:
+                self.prefetch_cancel = Event()
+                self.prefetch_thread = Thread(target=self._prefetch_after_debounce, args=(self.prefetch_cancel,), daemon=True)
+                self.prefetch_thread.start()
+
+    def _prefetch_after_debounce(self,cancel):
+        while not cancel.is_set():
+            with PREFETCH_LOCK:
+                remaining = self.prefetch_deadline - time.monotonic()
+                if remaining <= 0:
+                    self.prefetch_thread = None
+                    break
+
+            cancel.wait(remaining)
+        else:
+            return
+
+        self.prefetch_focused()
+
+    def cancel_prefetch(self):
+        with PREFETCH_LOCK:
+            if self.prefetch_cancel:
+                self.prefetch_cancel.set()
+            self.prefetch_thread = None
+
+    def prefetch_focused(self):
+        try:
+            control_id = self.getFocusId()
+        except RuntimeError:
+            return
+
+        if control_id not in self.PREFETCH_CONTAINERS:
+            return
+
+        next_id = xbmc.getInfoLabel('Container(%s).ListItem.Property(id)' % control_id)
+        next_call = xbmc.getInfoLabel('Container(%s).ListItem.Property(call)' % control_id)
+        next_season = xbmc.getInfoLabel('Container(%s).ListItem.Property(call_season)' % control_id)
+
+        if next_call in ['person','movie','tv'] and next_id and (next_id != str(self.tmdb_id) or next_season):
+            prefetch_request(next_call, next_id, next_season)
+
+
+''' Lazy container population for the person and video dialogs. The sections are built
+    on demand (LazyResult): the critical containers are filled in onInit, the others when
+    they get the focus or by a background pass that starts right after the dialog is open.
+    Sections waiting for a background fetch never block the GUI thread, they are streamed
+    into their containers as soon as the data arrives.
+    Paged containers (more) get their first page first, the remaining items are appended
+    in chunks after the first page of every container is filled.
+'''
+class LazyContainers(object):
+    def init_containers(self,sections,containers,critical,more=None):
+        self.sections = sections
+        self.containers = containers
+        self.container_keys = dict(containers)
+        self.critical = critical
+        self.more_keys = more or {}
+        self.filled = set()
+        self.filled_more = set()
+        self.container_locks = dict((control_id, Lock()) for control_id, key in containers)
+        self.fill_thread = None
+
+    def populate(self):
+        for control_id in self.critical:
+            self.fill_container(control_id)
+
+        if self.fill_thread and self.fill_thread.is_alive():
+            return
+
+        if any(control_id not in self.filled for control_id, key in self.containers):
+            self.fill_thread = Thread(target=self._fill_pending, daemon=True)
+            self.fill_thread.start()
+
+    def _fill_pending(self):
+        for control_id, key in self.containers:
+            self.fill_container(control_id)
+
+        for control_id in self.more_keys:
+            self.fill_more(control_id)
+
+        self.containers_filled()
+
+    def containers_filled(self):
+        pass
+
+    def fill_container(self,control_id):
+        key = self.container_keys.get(control_id)
+        if not key:
+            return
+
+        with self.container_locks[control_id]:
+            if control_id in self.filled:
+                return
+            self.filled.add(control_id)
+
+            try:
+                clist = self.getControl(control_id)
+                clist.addItems(render_items(self.sections[key]))
+            except RuntimeError as error:
+                log('Control with id %s cannot be filled. Error --> %s' % (str(control_id), error), DEBUG)
+                pass
+
+    def fill_more(self,control_id):
+        with self.container_locks[control_id]:
+            if control_id in self.filled_more or control_id not in self.filled:
+                return
+            self.filled_more.add(control_id)
+
+            items = self.sections[self.more_keys[control_id]] or []
+
+            try:
+                clist = self.getControl(control_id)
+                for index in range(0, len(items), FILL_CHUNK_SIZE):
+                    clist.addItems(render_items(items[index:index + FILL_CHUNK_SIZE]))
+            except RuntimeError as error:
+                log('Control with id %s cannot be filled. Error --> %s' % (str(control_id), error), DEBUG)
+                pass
+
+    def onFocus(self,controlId):
+        if controlId in self.container_keys and controlId not in self.filled:
+            Thread(target=self.fill_container, args=(controlId,), daemon=True).start()
+
+    ''' Sections that are not built yet are not forced into the snapshot (they may still wait
+        for the network). Only their keys and the call are kept, the restored dialog builds
+        them from a new request instead of holding on to the original result.
+    '''
+    def snapshot(self):
+        keys = [key for control_id, key in self.containers] + list(self.more_keys.values())
+        snapshot = {'dialog': self.SNAPSHOT_TYPE,
+                    'tmdb_id': self.tmdb_id,
+                    'sections': snapshot_sections(self.sections, keys)
+                    }
+
+        pending = [key for key in keys if key in self.sections.builders and not self.sections.is_built(key)]
+        if pending:
+            snapshot['pending'] = pending
+            snapshot['call'] = 'person' if self.SNAPSHOT_TYPE == 'person' else self.details[0].getProperty('call')
+
+        return snapshot
+
+
 ''' Person dialog
 '''
-class DialogPerson(xbmcgui.WindowXMLDialog):
+class DialogPerson(FocusPrefetch,LazyContainers,xbmcgui.WindowXMLDialog):
+    SNAPSHOT_TYPE = 'person'
+    PREFETCH_CONTAINERS = (10052, 10053, 10055)
+
     def __init__(self,*args,**kwargs):
         self.first_load = True
         self.action = {}
 
         self.tmdb_id = kwargs['tmdb_id']
-        self.person = kwargs['person']
-        self.movies = kwargs['movies']
-        self.tvshows = kwargs['tvshows']
-        self.combined = kwargs['combined']
-        self.images = kwargs['images']
+        self.init_containers(kwargs['sections'],
+                             [(10051, 'person'), (10052, 'movies'), (10053, 'tvshows'), (10054, 'images'), (10055, 'combined')],
+                             critical=[10051],
+                             more={10052: 'movies_more', 10053: 'tvshows_more', 10055: 'combined_more'}
+                             )
 
     def __getitem__(self,key):
         return self.action[key]
@@ -306,24 +674,36 @@ class DialogPerson(xbmcgui.WindowXMLDialog):
 
     def onInit(self):
         execute('ClearProperty(script.embuary.info-nextcall,home)')
+        self.schedule_prefetch()
 
         if self.first_load:
             self.add_items()
+        else:
+            self.populate()
 
     def add_items(self):
         self.first_load = False
+        self.populate()
 
-        index = 10051
-        li = [self.person, self.movies, self.tvshows, self.images, self.combined]
+    ''' The credit counts (local and total) depend on the credits, which may still be loading
+        when the person container is filled.
+    '''
+    def containers_filled(self):
+        person = self.sections['person']
+        counts = self.sections['counts']
+        if not person or not counts:
+            return
 
-        for items in li:
-            try:
-                clist = self.getControl(index)
-                clist.addItems(items)
-            except RuntimeError as error:
-                log('Control with id %s cannot be filled. Error --> %s' % (str(index), error), DEBUG)
-                pass
-            index += 1
+        try:
+            list_item = self.getControl(10051).getListItem(0)
+        except Exception as error:
+            log('Credit counts cannot be set on control 10051. Error --> %s' % error, DEBUG)
+            list_item = None
+
+        for key, value in counts.items():
+            person[0].setProperty(key, value)
+            if list_item:
+                list_item.setProperty(key, value)
 
     def onAction(self,action):
         if action.getId() in [92,10]:
@@ -332,6 +712,9 @@ class DialogPerson(xbmcgui.WindowXMLDialog):
             self.action['call'] = 'back' if action.getId() == 92 else 'close'
             self.quit()
 
+        else:
+            self.schedule_prefetch()
+
     def onClick(self,controlId):
         next_id = xbmc.getInfoLabel('Container(%s).ListItem.Property(id)' % controlId)
         next_call = xbmc.getInfoLabel('Container(%s).ListItem.Property(call)' % controlId)
@@ -346,6 +729,8 @@ class DialogPerson(xbmcgui.WindowXMLDialog):
             FullScreenImage(controlId)
 
     def quit(self):
+        self.cancel_prefetch()
+
         close_action = self.getProperty('onclose')
         onnext_action = self.getProperty('onnext')
         onback_action = self.getProperty('onback_%s' % self.getFocusId())
@@ -366,21 +751,21 @@ class DialogPerson(xbmcgui.WindowXMLDialog):
 
 ''' Show & movie dialog
 '''
-class DialogVideo(xbmcgui.WindowXMLDialog):
+class DialogVideo(FocusPrefetch,LazyContainers,xbmcgui.WindowXMLDialog):
+    SNAPSHOT_TYPE = 'video'
+    PREFETCH_CONTAINERS = (10052, 10053, 10056, 10057, 10058)
+
     def __init__(self,*args,**kwargs):
         self.first_load = True
         self.action = {}
 
         self.tmdb_id = kwargs['tmdb_id']
-        self.details = kwargs['details']
-        self.cast = kwargs['cast']
-        self.crew = kwargs['crew']
-        self.similar = kwargs['similar']
-        self.youtube = kwargs['youtube']
-        self.backdrops = kwargs['backdrops']
-        self.posters = kwargs['posters']
-        self.seasons = kwargs['seasons']
-        self.collection = kwargs['collection']
+        self.init_containers(kwargs['sections'],
+                             [(10051, 'details'), (10052, 'cast'), (10053, 'similar'), (10054, 'youtube'), (10055, 'backdrops'),
+                              (10056, 'crew'), (10057, 'collection'), (10058, 'seasons'), (10059, 'posters')],
+                             critical=[10051]
+                             )
+        self.details = self.sections['details']
 
     def __getitem__(self,key):
         return self.action[key]
@@ -390,24 +775,68 @@ class DialogVideo(xbmcgui.WindowXMLDialog):
 
     def onInit(self):
         execute('ClearProperty(script.embuary.info-nextcall,home)')
+        self.schedule_prefetch()
 
         if self.first_load:
             self.add_items()
+            self.load_reviews()
+            self.load_ratings()
+        else:
+            self.populate()
+
+    ''' Trakt reviews are not part of the critical path. Cached reviews are used right away,
+        otherwise they are fetched in the background and filled in after the dialog is open.
+    '''
+    def load_reviews(self):
+        if not self.details or not self.tmdb_id:
+            return
+
+        details = self.details[0]
+        if details.getProperty('first_review_content'):
+            return
+
+        Thread(target=self._fetch_reviews, args=(details,), daemon=True).start()
+
+    def _fetch_reviews(self,details):
+        review = tmdb_get_combined_reviews(self.tmdb_id, media_type=details.getProperty('call'))
+        if not review:
+            return
+
+        details.setProperty('first_review_content', review)
+
+        try:
+            self.getControl(10051).getListItem(0).setProperty('first_review_content', review)
+        except Exception as error:
+            log('Reviews cannot be set on control 10051. Error --> %s' % error, DEBUG)
+
+    ''' OMDb ratings are not awaited when the dialog opens either. They are set on the details
+        item as soon as the background fetch of the plan is done.
+    '''
+    def load_ratings(self):
+        if self.details:
+            Thread(target=self._set_ratings, args=(self.details[0],), daemon=True).start()
+
+    def _set_ratings(self,details):
+        omdb = self.sections['omdb']
+        if not omdb:
+            return
+
+        omdb_set_properties(details, omdb)
+
+        try:
+            omdb_set_properties(self.getControl(10051).getListItem(0), omdb)
+        except Exception as error:
+            log('OMDb ratings cannot be set on control 10051. Error --> %s' % error, DEBUG)
 
     def add_items(self):
         self.first_load = False
 
-        index = 10051
-        li = [self.details, self.cast, self.similar, self.youtube, self.backdrops, self.crew, self.collection, self.seasons, self.posters]
+        if self.details:
+            cached_review = tmdb_get_cached_reviews(self.tmdb_id, self.details[0].getProperty('call'))
+            if cached_review:
+                self.details[0].setProperty('first_review_content', cached_review)
 
-        for items in li:
-            try:
-                clist = self.getControl(index)
-                clist.addItems(items)
-            except RuntimeError as error:
-                log('Control with id %s cannot be filled. Error --> %s' % (str(index), error), DEBUG)
-                pass
-            index += 1
+        self.populate()
 
     def onAction(self,action):
         if action.getId() in [92,10]:
@@ -416,6 +845,9 @@ class DialogVideo(xbmcgui.WindowXMLDialog):
             self.action['call'] = 'back' if action.getId() == 92 else 'close'
             self.quit()
 
+        else:
+            self.schedule_prefetch()
+
     def onClick(self,controlId):
         next_id = xbmc.getInfoLabel('Container(%s).ListItem.Property(id)' % controlId)
         next_call = xbmc.getInfoLabel('Container(%s).ListItem.Property(call)' % controlId)
@@ -439,6 +871,8 @@ class DialogVideo(xbmcgui.WindowXMLDialog):
             self.quit()
 
     def quit(self):
+        self.cancel_prefetch()
+
         close_action = self.getProperty('onclose')
         onnext_action = self.getProperty('onnext')
         onback_action = self.getProperty('onback_%s' % self.getFocusId())
@@ -459,7 +893,9 @@ class DialogVideo(xbmcgui.WindowXMLDialog):
 
 ''' Season dialog
 '''
-class DialogSeason(xbmcgui.WindowXMLDialog):
+class DialogSeason(FocusPrefetch,xbmcgui.WindowXMLDialog):
+    PREFETCH_CONTAINERS = (10052, 10056)
+
     def __init__(self,*args,**kwargs):
         self.first_load = True
         self.action = {}
@@ -469,15 +905,25 @@ class DialogSeason(xbmcgui.WindowXMLDialog):
         self.cast = kwargs['cast']
         self.gueststars = kwargs['gueststars']
         self.posters = kwargs['posters']
+        self.adjacent = kwargs.get('adjacent') or []
 
     def __getitem__(self,key):
         return self.action[key]
 
+    def snapshot(self):
+        sections = {'details': self.details, 'cast': self.cast, 'gueststars': self.gueststars, 'posters': self.posters}
+        return {'dialog': 'season',
+                'tmdb_id': self.tmdb_id,
+                'adjacent': self.adjacent,
+                'sections': snapshot_sections(sections, list(sections))
+                }
+
     def __setitem__(self,key,value):
         self.action[key] = value
 
     def onInit(self):
         execute('ClearProperty(script.embuary.info-nextcall,home)')
+        self.schedule_prefetch()
 
         if self.first_load:
             self.add_items()
@@ -485,13 +931,16 @@ class DialogSeason(xbmcgui.WindowXMLDialog):
     def add_items(self):
         self.first_load = False
 
+        # Temporadas vizinhas (N+1, N-1) costumam ser as próximas abertas
+        prefetch_seasons(self.tmdb_id, self.adjacent)
+
         index = [10051, 10052, 10056, 10059]
         li = [self.details, self.cast, self.gueststars, self.posters]
 
         for items in li:
             try:
                 clist = self.getControl(index[li.index(items)])
-                clist.addItems(items)
+                clist.addItems(render_items(items))
             except RuntimeError as error:
                 log('Control with id %s cannot be filled. Error --> %s' % (str(index[li.index(items)]), error), DEBUG)
                 pass
@@ -503,6 +952,9 @@ class DialogSeason(xbmcgui.WindowXMLDialog):
             self.action['call'] = 'back' if action.getId() == 92 else 'close'
             self.quit()
 
+        else:
+            self.schedule_prefetch()
+
     def onClick(self,controlId):
         next_id = xbmc.getInfoLabel('Container(%s).ListItem.Property(id)' % controlId)
         next_call = xbmc.getInfoLabel('Container(%s).ListItem.Property(call)' % controlId)
@@ -517,6 +969,8 @@ class DialogSeason(xbmcgui.WindowXMLDialog):
             FullScreenImage(controlId)
 
     def quit(self):
+        self.cancel_prefetch()
+
         close_action = self.getProperty('onclose')
         onnext_action = self.getProperty('onnext')
         onback_action = self.getProperty('onback_%s' % self.getFocusId())
@@ -541,7 +995,8 @@ class FullScreenImage(object):
     def __init__(self,controlId):
         slideshow = []
         for i in range(int(xbmc.getInfoLabel('Container(%s).NumItems' % controlId))):
-            slideshow.append(xbmc.getInfoLabel('Container(%s).ListItemAbsolute(%s).Art(thumb)' % (controlId,i)))
+            image = xbmc.getInfoLabel('Container(%s).ListItemAbsolute(%s).Art(original)' % (controlId,i))
+            slideshow.append(image or xbmc.getInfoLabel('Container(%s).ListItemAbsolute(%s).Art(thumb)' % (controlId,i)))
 
         dialog = self.ShowImage('script-embuary-image.xml', ADDON_PATH, 'default', '1080i', slideshow=slideshow, position=xbmc.getInfoLabel('Container(%s).CurrentItem' % controlId))
         dialog.doModal()
@@ -0,0 +1,169 @@
+#!/usr/bin/python
+# coding: utf-8
+
+########################
+
+import xbmcgui
+
+########################
+
+class MediaItem(object):
+    """
+    Modelo compacto de item (filme, série, temporada, pessoa, crédito...).
+
+    Os builders tmdb_handle_* preenchem este modelo em vez de um
+    xbmcgui.ListItem. Por isso ele expõe o mesmo subconjunto da API de
+    ListItem usado por eles (setInfo, setArt, setProperty, setLabel2, get*).
+    O ListItem real só é criado na renderização, via to_listitem().
+
+    Features:
+    - __slots__ (sem __dict__ por instância, barato de construir)
+    - Serializável: to_dict()/from_dict() para caches JSON e pickle nativo
+    - Compartilhável entre service, plugin e dialogs
+    """
+
+    __slots__ = ('label', 'label2', 'info', 'art', 'properties')
+
+    TYPE = 'item'
+
+    def __init__(self, label='', label2='', info=None, art=None, properties=None):
+        self.label = label or ''
+        self.label2 = label2 or ''
+        self.info = info if info is not None else {}
+        self.art = art if art is not None else {}
+        self.properties = properties if properties is not None else {}
+
+    def __repr__(self):
+        return '<%s %r id=%s>' % (self.__class__.__name__, self.label, self.properties.get('id', ''))
+
+    def __getstate__(self):
+        return (self.label, self.label2, self.info, self.art, self.properties)
+
+    def __setstate__(self, state):
+        self.label, self.label2, self.info, self.art, self.properties = state
+
+    # API compatível com xbmcgui.ListItem (usada pelos builders)
+    def setLabel(self, label):
+        self.label = label or ''
+
+    def setLabel2(self, label2):
+        self.label2 = label2 or ''
+
+    def getLabel(self):
+        return self.label
+
+    def getLabel2(self):
+        return self.label2
+
+    def setInfo(self, info_type, info_labels):
+        self.info.update(info_labels)
+
+    def setArt(self, art):
+        self.art.update(art)
+
+    def getArt(self, key):
+        return self.art.get(key, '')
+
+    def setProperty(self, key, value):
+        self.properties[key] = value
+
+    def getProperty(self, key):
+        return self.properties.get(key, '')
+
+    # Serialização
+    def to_dict(self):
+        data = {'type': self.TYPE, 'label': self.label}
+
+        if self.label2:
+            data['label2'] = self.label2
+        if self.info:
+            data['info'] = self.info
+        if self.art:
+            data['art'] = self.art
+        if self.properties:
+            data['properties'] = self.properties
+
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(label=data.get('label', ''),
+                   label2=data.get('label2', ''),
+                   info=dict(data.get('info', {})),
+                   art=dict(data.get('art', {})),
+                   properties=dict(data.get('properties', {}))
+                   )
+
+    # Renderização
+    def to_listitem(self):
+        """
+        Cria o xbmcgui.ListItem final. Único ponto onde objetos de GUI nascem.
+        offscreen=True evita o lock da GUI (item ainda não está em um container).
+        """
+        list_item = xbmcgui.ListItem(label=self.label, label2=self.label2, offscreen=True)
+
+        if self.info:
+            list_item.setInfo('video', self.info)
+        if self.art:
+            list_item.setArt(self.art)
+
+        for key, value in self.properties.items():
+            list_item.setProperty(key, value if isinstance(value, str) else str(value))
+
+        return list_item
+
+
+class Movie(MediaItem):
+    __slots__ = ()
+    TYPE = 'movie'
+
+
+class TVShow(MediaItem):
+    __slots__ = ()
+    TYPE = 'tv'
+
+
+class Season(MediaItem):
+    __slots__ = ()
+    TYPE = 'season'
+
+
+class Person(MediaItem):
+    __slots__ = ()
+    TYPE = 'person'
+
+
+class Credit(MediaItem):
+    __slots__ = ()
+    TYPE = 'credit'
+
+
+class Image(MediaItem):
+    __slots__ = ()
+    TYPE = 'image'
+
+
+class Video(MediaItem):
+    __slots__ = ()
+    TYPE = 'youtube'
+
+########################
+
+MODEL_TYPES = dict((model.TYPE, model) for model in (MediaItem, Movie, TVShow, Season, Person, Credit, Image, Video))
+
+
+def model_from_dict(data):
+    return MODEL_TYPES.get(data.get('type'), MediaItem).from_dict(data)
+
+
+def models_to_dicts(items):
+    return [item.to_dict() for item in items]
+
+
+def models_from_dicts(items):
+    return [model_from_dict(item) for item in items]
+
+
+def render_items(items):
+    """Converte uma lista de modelos em ListItems (ListItems já prontos passam direto)"""
+    return [item.to_listitem() if isinstance(item, MediaItem) else item for item in items]
@@ -9,6 +9,70 @@ from resources.lib.helper import *
 from resources.lib.tmdb import *
 from resources.lib.trakt import *
 from resources.lib.localdb import *
+from resources.lib.tasks import get_task_pool
+
+########################
+
+EPISODE_FETCH_TIMEOUT = 30
+EPISODE_CACHE_HOURS = 72
+CALENDAR_DAYS = 8
+CALENDAR_CACHE_HOURS = 48
+LIBRARY_SCHEDULE_TIMEOUT = 60
+SHOW_RETURNING_CACHE_HOURS = 24
+SHOW_ENDED_CACHE_HOURS = 24 * 7
+TMDB_ID_CACHE_HOURS = 24 * 30
+TMDB_ID_MISSING_CACHE_HOURS = 24 * 7
+
+NEXTAIRED_SOURCE_TRAKT = 0
+NEXTAIRED_SOURCE_LIBRARY = 1
+NEXTAIRED_SOURCE = ADDON.getSettingInt('nextaired_source')
+
+########################
+
+class LibraryIndex(object):
+    ''' Lookup tables over the local shows by TMDB, TVDB and IMDb ID and by (title, year) for
+        title and original title. Every table keeps the first show of the library for a key,
+        so a calendar item is matched to the same show as by a scan of the library.
+    '''
+    def __init__(self,shows):
+        self.shows = shows or []
+        self.by_tmdb = {}
+        self.by_tvdb = {}
+        self.by_imdb = {}
+        self.by_title = {}
+
+        for position, item in enumerate(self.shows):
+            for table, value in ((self.by_tmdb, item.get('tmdbid')), (self.by_tvdb, item.get('tvdbid')), (self.by_imdb, item.get('imdbnumber'))):
+                if value:
+                    table.setdefault(str(value), position)
+
+            for title in (item.get('title'), item.get('originaltitle')):
+                if title:
+                    self.by_title.setdefault((title, item.get('year')), position)
+
+    def match(self,tmdb_id,tvdb_id,imdb_id,title,year):
+        positions = [position for position in (self.by_tmdb.get(str(tmdb_id)),
+                                               self.by_tvdb.get(str(tvdb_id)),
+                                               self.by_imdb.get(str(imdb_id)),
+                                               self.by_title.get((title, year)))
+                     if position is not None]
+
+        if positions:
+            return self.shows[min(positions)]
+
+
+''' One index per library snapshot (keyed by its fingerprint).
+'''
+LIBRARY_INDEX = {}
+
+def get_library_index(shows,library_hash):
+    index = LIBRARY_INDEX.get(library_hash)
+
+    if index is None:
+        LIBRARY_INDEX.clear()
+        index = LIBRARY_INDEX[library_hash] = LibraryIndex(shows)
+
+    return index
 
 ########################
 
@@ -18,18 +82,28 @@ class NextAired():
         local_date = utc_date.to(TIMEZONE)
         self.date_today = utc_date.strftime('%Y-%m-%d')
 
+        ''' The library is a shared snapshot and only read here. Its fingerprint ignores
+            playcounts, so watching an episode keeps the cached schedule.
+        '''
         local_media = get_local_media()
-        self.local_media = local_media['shows']
+        self.local_media = local_media.get('shows') or []
+        self.library_hash = library_fingerprint(local_media, 'shows')
+
+        ''' The assembled week only saves the work within a day. A new day or a changed library
+            is assembled again from the calendar days and episodes that are already cached.
+        '''
+        cache_key = 'nextaired_' + self.date_today + '_' + self.library_hash
 
-        if self.local_media:
-            for item in self.local_media:
-                del item['playcount']
-                del item['watchedepisodes']
+        if NEXTAIRED_SOURCE == NEXTAIRED_SOURCE_LIBRARY:
+            cache_key += '_library'
 
-        cache_key = 'nextaired_' + self.date_today + '_' + md5hash(self.local_media)
         self.airing_items = get_cache(cache_key)
 
         if not self.airing_items:
+            ''' A lookup that failed or timed out leaves the week incomplete. It is shown, but
+                not cached, so the next call completes it from the per show/episode caches.
+            '''
+            self.complete = True
             self.valid_days = []
             tmp_day = local_date
             for i in range(7):
@@ -49,8 +123,8 @@ class NextAired():
             self.airing_items = airing_items
             self.getdata()
 
-        if self.airing_items:
-            write_cache(cache_key, self.airing_items, 24)
+            if self.complete:
+                write_cache(cache_key, self.airing_items, 24)
 
     def get(self,day=None):
         if day is not None and day in self.airing_items:
@@ -62,11 +136,43 @@ class NextAired():
         if not self.local_media:
             return
 
-        local_media_data = []
-        for item in self.local_media:
-            local_media_data.append([item.get('tmdbid'), item.get('tvdbid'), item.get('imdbnumber'), item.get('art'), item.get('title'), item.get('originaltitle'), item.get('year')])
+        if NEXTAIRED_SOURCE == NEXTAIRED_SOURCE_LIBRARY:
+            matched = self.get_library_schedule()
+        else:
+            matched = self.get_trakt_schedule()
+
+        ''' Episode details of all matched items are fetched concurrently (cache hits skip the
+            network), the results are assembled in calendar order.
+        '''
+        for entry, episode_query in zip(matched, self.get_episodes(matched)):
+            if not episode_query:
+                continue
 
-        trakt_results = trakt_api('/calendars/all/shows/' + self.date_today + '/8?extended=full&countries=' + COUNTRY_CODE.lower() + '%2Cus')
+            local_show = entry['local_show']
+            episode_query['localart'] = local_show.get('art')
+            episode_query['showtitle'] = local_show.get('title') or local_show.get('originaltitle')
+            episode_query['airing'] = entry['airing']
+            episode_query['airing_time'] = entry['airing_time']
+            episode_query['weekday'] = entry['weekday']
+            episode_query['weekday_code'] = entry['weekday_code']
+            episode_query['network'] = entry['network']
+            episode_query['country'] = entry['country']
+            episode_query['status'] = entry['status']
+            episode_query['runtime'] = entry['runtime']
+            episode_query['show_id'] = entry['tmdb_id']
+            episode_query['overview'] = tmdb_fallback_info(episode_query, 'overview')
+            episode_query['name'] = tmdb_fallback_info(episode_query, 'name')
+
+            self.airing_items['week'].append(episode_query)
+            self.airing_items[str(entry['weekday_code'])].append(episode_query)
+
+    def get_trakt_schedule(self):
+        ''' Global Trakt calendar of the next 8 days, matched against the library index.
+        '''
+        library = get_library_index(self.local_media, self.library_hash)
+        matched = []
+
+        trakt_results = self.get_trakt_calendar()
 
         if trakt_results:
             for item in trakt_results:
@@ -97,40 +203,247 @@ class NextAired():
                 season_nr = episode.get('season')
                 episode_nr = episode.get('number')
 
-                for i in local_media_data:
-                    if str(tmdb_id) == i[0] or str(tvdb_id) == i[1] or str(imdb_id) == i[2] or (tvshowtitle in [i[4], i[5]] and year == i[6]):
-                        episode_cache_key = 'nextaired_tmdb_episode_' + COUNTRY_CODE + '_' + str(tmdb_id_episode)
-                        episode_query = get_cache(episode_cache_key)
-
-                        if not episode_query:
-                            episode_query = tmdb_query(action='tv',
-                                                       call=tmdb_id,
-                                                       get='season',
-                                                       get2=season_nr,
-                                                       get3='episode',
-                                                       get4=episode_nr,
-                                                       params={'append_to_response': 'translations'}
-                                                       )
-
-                            if episode_query:
-                                write_cache(episode_cache_key, episode_query, 48)
-
-                        if episode_query:
-                            episode_query['localart'] = i[3]
-                            episode_query['showtitle'] = i[4] or i[5]
-                            episode_query['airing'] = airing_date
-                            episode_query['airing_time'] = airing_time
-                            episode_query['weekday'] = weekday
-                            episode_query['weekday_code'] = weekday_code
-                            episode_query['network'] = network
-                            episode_query['country'] = country
-                            episode_query['status'] = status
-                            episode_query['runtime'] = runtime
-                            episode_query['show_id'] = tmdb_id
-                            episode_query['overview'] = tmdb_fallback_info(episode_query, 'overview')
-                            episode_query['name'] = tmdb_fallback_info(episode_query, 'name')
-
-                            self.airing_items['week'].append(episode_query)
-                            self.airing_items[str(weekday_code)].append(episode_query)
-
-                        break
\ No newline at end of file
+                local_show = library.match(tmdb_id, tvdb_id, imdb_id, tvshowtitle, year)
+                if not local_show:
+                    continue
+
+                matched.append({'local_show': local_show,
+                                'tmdb_id': tmdb_id,
+                                'tmdb_id_episode': tmdb_id_episode,
+                                'season_nr': season_nr,
+                                'episode_nr': episode_nr,
+                                'airing': airing_date,
+                                'airing_time': airing_time,
+                                'weekday': weekday,
+                                'weekday_code': weekday_code,
+                                'network': network,
+                                'country': country,
+                                'status': status,
+                                'runtime': runtime
+                                })
+
+        return matched
+
+    def get_trakt_calendar(self):
+        ''' Calendar items of the next 8 days (UTC), cached per airing date. A new day only
+            requests the date that entered the window, expired dates are requested again when
+            they are read. Consecutive missing dates are requested in one call.
+        '''
+        start = arrow.get(self.date_today)
+        days = [start.shift(days=i).strftime('%Y-%m-%d') for i in range(CALENDAR_DAYS)]
+        calendar = dict((day, get_cache(self.calendar_cache_key(day))) for day in days)
+
+        for first_day, count in self.missing_day_ranges(days, calendar):
+            results = trakt_api('/calendars/all/shows/' + first_day + '/' + str(count) + '?extended=full&countries=' + COUNTRY_CODE.lower() + '%2Cus')
+            ''' A failed request leaves its days uncached and the week incomplete.
+            '''
+            if results is None:
+                self.complete = False
+                continue
+
+            ''' Empty days are cached as well, an empty list would not be written.
+            '''
+            index = days.index(first_day)
+            fetched = dict((day, {'items': []}) for day in days[index:index + count])
+
+            for item in results:
+                airing_day = (item.get('first_aired') or '')[:10]
+                if airing_day in fetched:
+                    fetched[airing_day]['items'].append(item)
+
+            for day, day_items in fetched.items():
+                calendar[day] = day_items
+                write_cache(self.calendar_cache_key(day), day_items, CALENDAR_CACHE_HOURS)
+
+        return [item for day in days if calendar[day] for item in calendar[day]['items']]
+
+    def missing_day_ranges(self,days,calendar):
+        ranges = []
+        previous = None
+
+        for index, day in enumerate(days):
+            if calendar[day]:
+                continue
+
+            if ranges and previous == index - 1:
+                ranges[-1][1] += 1
+            else:
+                ranges.append([day, 1])
+
+            previous = index
+
+        return ranges
+
+    def calendar_cache_key(self,day):
+        return 'nextaired_calendar_' + COUNTRY_CODE + '_' + day
+
+    def get_library_schedule(self):
+        ''' Schedule built from the library shows instead of the global calendar. The next
+            episode of every show (TMDB next_episode_to_air) is cached until it has aired, so
+            only shows with an aired or unknown next episode are requested again. The season
+            of the shows whose next episode is inside the window is looked up for all the
+            episodes of the week. TMDB only has air dates, the airing time stays empty.
+        '''
+        matched = []
+        shows = get_task_pool().map(self.get_library_show, self.local_media, timeout=LIBRARY_SCHEDULE_TIMEOUT)
+        if None in shows:
+            self.complete = False
+
+        airing = [(local_show, show) for local_show, show in zip(self.local_media, shows)
+                  if show and show.get('next') and show['next'].get('air_date') in self.valid_days]
+        seasons = get_task_pool().map(lambda item: self.get_season_episodes(item[1]['tmdb_id'], item[1]['next']['season_number']), airing, timeout=LIBRARY_SCHEDULE_TIMEOUT)
+        if None in seasons:
+            self.complete = False
+
+        for (local_show, show), episodes in zip(airing, seasons):
+            next_episode = show['next']
+
+            for episode in episodes or [next_episode]:
+                airing_date = episode.get('air_date')
+                if airing_date not in self.valid_days or episode.get('episode_number', 0) < next_episode['episode_number']:
+                    continue
+
+                weekday, weekday_code = date_weekday(airing_date)
+                runtime = episode.get('runtime') or show.get('runtime')
+
+                matched.append({'local_show': local_show,
+                                'tmdb_id': show['tmdb_id'],
+                                'tmdb_id_episode': episode.get('id'),
+                                'season_nr': episode.get('season_number'),
+                                'episode_nr': episode.get('episode_number'),
+                                'airing': airing_date,
+                                'airing_time': '',
+                                'weekday': weekday,
+                                'weekday_code': weekday_code,
+                                'network': show.get('network'),
+                                'country': show.get('country'),
+                                'status': show.get('status'),
+                                'runtime': runtime * 60 if runtime else 0
+                                })
+
+        return sorted(matched, key=lambda entry: (entry['airing'], entry['local_show'].get('title') or ''))
+
+    ''' Library show lookups return None if the request failed and False for shows that
+        have no TMDB entry.
+    '''
+    def get_library_show(self,local_show):
+        tmdb_id = local_show.get('tmdbid') or self.find_tmdb_id(local_show)
+        if not tmdb_id:
+            return tmdb_id
+
+        cache_key = 'nextaired_show_' + str(tmdb_id)
+        show = get_cache(cache_key)
+
+        if not show:
+            details = tmdb_query(action='tv', call=tmdb_id)
+            if not details:
+                return
+
+            show = {'tmdb_id': str(tmdb_id),
+                    'next': details.get('next_episode_to_air'),
+                    'network': details['networks'][0].get('name') if details.get('networks') else '',
+                    'country': details['origin_country'][0] if details.get('origin_country') else '',
+                    'status': details.get('status'),
+                    'runtime': details['episode_run_time'][0] if details.get('episode_run_time') else 0
+                    }
+
+            write_cache(cache_key, show, self.show_cache_hours(show))
+
+        return show
+
+    def show_cache_hours(self,show):
+        ''' Until the next episode has aired. Without a next episode the show is checked once a
+            day, so a newly announced episode shows up quickly, or once a week if it has ended.
+        '''
+        air_date = (show.get('next') or {}).get('air_date')
+
+        if air_date:
+            try:
+                hours = (arrow.get(air_date).shift(days=1) - arrow.utcnow()).total_seconds() / 3600
+                return max(1, int(hours))
+            except Exception:
+                pass
+
+        if show.get('status') in ['Ended', 'Canceled']:
+            return SHOW_ENDED_CACHE_HOURS
+
+        return SHOW_RETURNING_CACHE_HOURS
+
+    def find_tmdb_id(self,local_show):
+        external_id = local_show.get('imdbnumber') or local_show.get('tvdbid')
+        if not external_id:
+            return False
+
+        ''' Shows that TMDB doesn't know are cached as well (empty ID), so they are not
+            looked up again on every run.
+        '''
+        cache_key = 'nextaired_tmdbid_' + str(external_id)
+        cached = get_cache(cache_key)
+
+        if cached:
+            return cached['tmdb_id'] or False
+
+        result = tmdb_query(action='find',
+                            call=str(external_id),
+                            params={'external_source': 'imdb_id' if str(external_id).startswith('tt') else 'tvdb_id'},
+                            use_language=False
+                            )
+
+        if not result:
+            return
+
+        if result.get('tv_results'):
+            tmdb_id = str(result['tv_results'][0]['id'])
+            write_cache(cache_key, {'tmdb_id': tmdb_id}, TMDB_ID_CACHE_HOURS)
+            return tmdb_id
+
+        write_cache(cache_key, {'tmdb_id': ''}, TMDB_ID_MISSING_CACHE_HOURS)
+        return False
+
+    def get_season_episodes(self,tmdb_id,season):
+        cache_key = 'nextaired_season_' + str(tmdb_id) + '_' + str(season)
+        episodes = get_cache(cache_key)
+
+        if not episodes:
+            details = tmdb_query(action='tv',
+                                 call=tmdb_id,
+                                 get='season',
+                                 get2=season
+                                 )
+
+            episodes = details.get('episodes') if details else None
+            write_cache(cache_key, episodes, 24)
+
+        return episodes
+
+    def get_episodes(self,matched):
+        episodes = [get_cache(self.episode_cache_key(entry)) for entry in matched]
+        missing = [index for index, episode_query in enumerate(episodes) if not episode_query]
+
+        if missing:
+            fetched = get_task_pool().map(self.fetch_episode, [matched[index] for index in missing], timeout=EPISODE_FETCH_TIMEOUT)
+            for index, episode_query in zip(missing, fetched):
+                episodes[index] = episode_query
+
+            if None in fetched:
+                self.complete = False
+
+        return episodes
+
+    def episode_cache_key(self,entry):
+        return 'nextaired_tmdb_episode_' + COUNTRY_CODE + '_' + str(entry['tmdb_id_episode'])
+
+    def fetch_episode(self,entry):
+        episode_query = tmdb_query(action='tv',
+                                   call=entry['tmdb_id'],
+                                   get='season',
+                                   get2=entry['season_nr'],
+                                   get3='episode',
+                                   get4=entry['episode_nr'],
+                                   params={'append_to_response': 'translations'}
+                                   )
+
+        if episode_query:
+            write_cache(self.episode_cache_key(entry), episode_query, EPISODE_CACHE_HOURS)
+
+        return episode_query
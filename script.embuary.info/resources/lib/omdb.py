@@ -14,6 +14,11 @@ from resources.lib.helper import *
 
 OMDB_API_KEY = ADDON.getSettingString('omdb_api_key')
 
+# Memo por processo: o plano de requisições aquece a consulta em background e
+# omdb_properties() lê o mesmo resultado, inclusive respostas vazias que
+# write_cache() não persiste.
+OMDB_MEMO = {}
+
 ########################
 
 def omdb_api(imdbnumber=None,title=None,year=None,content_type=None):
@@ -32,8 +37,12 @@ def omdb_api(imdbnumber=None,title=None,year=None,content_type=None):
     else:
         return
 
+    if url in OMDB_MEMO:
+        return OMDB_MEMO[url]
+
     omdb = get_cache(url)
     if omdb:
+        OMDB_MEMO[url] = omdb
         return omdb
 
     elif OMDB_API_KEY:
@@ -81,4 +90,5 @@ def omdb_api(imdbnumber=None,title=None,year=None,content_type=None):
                 write_cache(url,omdb)
                 break
 
+        OMDB_MEMO[url] = omdb
         return omdb
\ No newline at end of file
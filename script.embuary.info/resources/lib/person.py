@@ -4,11 +4,14 @@
 ########################
 
 import sys
+import heapq
+import operator
 import xbmc
 import xbmcgui
 
 from resources.lib.helper import *
 from resources.lib.tmdb import *
+from resources.lib.tasks import LazyResult, get_task_pool
 
 ########################
 
@@ -17,76 +20,200 @@ FILTER_SHOWS = ADDON.getSettingBool('filter_shows')
 FILTER_SHOWS_BLACKLIST = [10763, 10764, 10767]
 FILTER_UPCOMING = ADDON.getSettingBool('filter_upcoming')
 FILTER_DAYDELTA = ADDON.getSettingInt('filter_daydelta')
+CREDITS_SYNC = ADDON.getSettingInt('person_credits_sync') or 50
+PERSON_APPEND = 'translations,movie_credits,tv_credits,images'
 
 ########################
 
+def tmdb_get_cached_person(tmdb_id):
+    cache_key = 'person' + str(tmdb_id)
+    details = get_cache(cache_key)
+
+    if details:
+        version = details.get(TMDB_SCHEMA_KEY)
+        details = tmdb_upgrade_payload(details, 'person')
+        if details and version != TMDB_SCHEMA_VERSION:
+            write_cache(cache_key, details)
+
+    return details
+
+
+def tmdb_prefetch_person(tmdb_id):
+    ''' Complete person document (credits and images included) into the cache.
+    '''
+    if tmdb_get_cached_person(tmdb_id):
+        return
+
+    details = tmdb_query(action='person',
+                         call=tmdb_id,
+                         params={'append_to_response': PERSON_APPEND},
+                         show_error=False
+                         )
+
+    write_cache('person' + str(tmdb_id), tmdb_trim_payload(details, 'person'))
+
+
 class TMDBPersons(object):
     def __init__(self,call_request):
         self.tmdb_id = call_request['tmdb_id']
         self.local_movies = call_request['local_movies']
         self.local_shows = call_request['local_shows']
-        self.result = {}
+        self.result = LazyResult()
+        self.credits = None
 
         if self.tmdb_id:
-            cache_key = 'person' + str(self.tmdb_id)
-            self.details = get_cache(cache_key)
+            self.cache_key = 'person' + str(self.tmdb_id)
+            self.details = tmdb_get_cached_person(self.tmdb_id)
 
+            ''' Without cache only the person itself is awaited. Credits and images are the
+                heavy part of the payload and are fetched in the background.
+            '''
             if not self.details:
                 self.details = tmdb_query(action='person',
                                           call=self.tmdb_id,
-                                          params={'append_to_response': 'translations,movie_credits,tv_credits,images'},
+                                          params={'append_to_response': 'translations'},
                                           show_error=True
                                           )
 
-                write_cache(cache_key, self.details)
+                if self.details:
+                    self.credits = get_task_pool().submit(self._fetch_credits)
 
             if not self.details:
                 return
 
-            self.local_movie_count = 0
-            self.local_tv_count = 0
-            self.all_credits = list()
+            self.built = {}
 
-            self.result['movies'] = self.get_movie_list()
-            self.result['tvshows'] = self.get_tvshow_list()
-            self.result['combined'] = self.get_combined_list()
-            self.result['person'] = self.get_person_details()
-            self.result['images'] = self.get_person_images()
+            # Seções sob demanda. Filmes, séries e a lista combinada vêm de uma
+            # única passada pelos créditos ('credits') e compartilham os itens.
+            # Cada lista é paginada: os CREDITS_SYNC mais recentes e o restante
+            # ('*_more'), que o dialog adiciona em blocos depois de abrir
+            self.result.add('credits', self.get_credits)
+            for key in ('movies', 'tvshows', 'combined'):
+                self.result.add(key, lambda key=key: self._build_list(self.result['credits'][key][:CREDITS_SYNC]))
+                self.result.add(key + '_more', lambda key=key: self._build_list(self.result['credits'][key][CREDITS_SYNC:]))
+            self.result.add('person', self.get_person_details)
+            self.result.add('images', self.get_person_images)
+            self.result.add('counts', self.get_counts)
 
     def __getitem__(self,key):
         return self.result.get(key, '')
 
+    ''' The background fetch returns its own credits/images dict, self.details is never
+        modified after the dialog has been created.
+    '''
+    def _fetch_credits(self):
+        credits = tmdb_query(action='person',
+                             call=self.tmdb_id,
+                             params={'append_to_response': 'movie_credits,tv_credits,images'},
+                             show_error=False
+                             )
+
+        if not credits:
+            return {}
+
+        credits = tmdb_trim_payload(credits, 'person')
+        credits = dict((key, credits.get(key) or {}) for key in ('movie_credits', 'tv_credits', 'images'))
+
+        document = dict(self.details)
+        document.update(credits)
+        write_cache(self.cache_key, tmdb_trim_payload(document, 'person'))
+
+        return credits
+
+    def _get_credits(self):
+        if self.credits is None:
+            return self.details
+
+        try:
+            return self.credits.result(timeout=30) or {}
+        except Exception as error:
+            log('Person credits cannot be fetched. Error --> %s' % error, DEBUG)
+            return {}
+
     def get_person_details(self):
         li = list()
 
-        list_item = tmdb_handle_person(self.details)
-        list_item.setProperty('LocalMovies', str(self.local_movie_count))
-        list_item.setProperty('LocalTVShows', str(self.local_tv_count))
-        list_item.setProperty('LocalMedia', str(self.local_movie_count + self.local_tv_count))
+        list_item = tmdb_handle_person(self.details, art_context='detail')
+
+        ''' Credit counts need the credits. If they are still loading, the dialog sets them
+            later from the 'counts' section.
+        '''
+        if self.credits is None or self.credits.done():
+            for key, value in self.result.get('counts').items():
+                list_item.setProperty(key, value)
+
         li.append(list_item)
 
         return li
 
-    def get_combined_list(self):
-        combined = sort_dict(self.all_credits, 'release_date', True)
-        li = list()
+    def get_counts(self):
+        credits = self.result['credits']
+        movies = sum(1 for item in credits['movies'] if self._is_local(item))
+        tvshows = sum(1 for item in credits['tvshows'] if self._is_local(item))
+
+        ''' Totals of the complete filmography. The containers may still be loading the
+            remaining pages, so NumItems is not reliable for them.
+        '''
+        return {'LocalMovies': str(movies),
+                'LocalTVShows': str(tvshows),
+                'LocalMedia': str(movies + tvshows),
+                'TotalMovies': str(len(credits['movies'])),
+                'TotalTVShows': str(len(credits['tvshows'])),
+                'TotalCredits': str(len(credits['combined']))
+                }
+
+    ''' Local check on the raw credit, with the same fields tmdb_handle_movie/tvshow use.
+        The counts cover the complete filmography without building its ListItems.
+    '''
+    def _is_local(self,item):
+        if item['type'] == 'movie':
+            label = item['title'] or item['original_title']
+            local_info = tmdb_check_localdb(self.local_movies, label, item.get('original_title', ''), item.get('release_date'), item.get('imdb_id', ''))
+        else:
+            label = item['name'] or item['original_name']
+            local_info = tmdb_check_localdb(self.local_shows, label, item.get('original_name', ''), item.get('first_air_date'), item.get('external_ids', {}).get('tvdb_id', ''))
+
+        return local_info['dbid'] > 0
+
+    ''' Single pass over the credits: each type is sorted once and filtered with a set based
+        duplicate check. The combined list is a merge of both already sorted streams.
+    '''
+    def get_credits(self):
+        credits = self._get_credits()
+
+        movies = self._filter_movies(sort_dict(credits.get('movie_credits', {}).get('cast', []), 'release_date', True))
+        tvshows = self._filter_tvshows(sort_dict(credits.get('tv_credits', {}).get('cast', []), 'first_air_date', True))
+        combined = list(heapq.merge(movies, tvshows, key=operator.itemgetter('release_date'), reverse=True))
+
+        return {'movies': movies, 'tvshows': tvshows, 'combined': combined}
+
+    ''' ListItems are built once per credit and shared by the movie/tv and the combined list.
+    '''
+    def _build_items(self,credits):
+        items = []
+
+        for item in credits:
+            key = (item['type'], item['id'])
+            built = self.built.get(key)
+
+            if built is None:
+                if item['type'] == 'movie':
+                    built = tmdb_handle_movie(item, self.local_movies)
+                else:
+                    built = tmdb_handle_tvshow(item, self.local_shows)
 
-        for item in combined:
-            if item['type'] == 'movie':
-                list_item, is_local = tmdb_handle_movie(item, self.local_movies)
+                self.built[key] = built
 
-            elif item['type'] =='tvshow':
-                list_item, is_local = tmdb_handle_tvshow(item, self.local_shows)
+            items.append(built)
 
-            li.append(list_item)
+        return items
 
-        return li
+    def _build_list(self,credits):
+        return [list_item for list_item, is_local in self._build_items(credits)]
 
-    def get_movie_list(self):
-        movies = self.details['movie_credits']['cast']
-        movies = sort_dict(movies, 'release_date', True)
-        li = list()
-        duplicate_handler = list()
+    def _filter_movies(self,movies):
+        credits = list()
+        duplicate_handler = set()
 
         for item in movies:
             skip_movie = False
@@ -109,23 +236,15 @@ class TMDBPersons(object):
                     skip_movie = True
 
             if not skip_movie and item['id'] not in duplicate_handler:
-                list_item, is_local = tmdb_handle_movie(item, self.local_movies)
-                li.append(list_item)
-                duplicate_handler.append(item['id'])
+                duplicate_handler.add(item['id'])
                 item['type'] = 'movie'
+                credits.append(item)
 
-                if is_local:
-                    self.local_movie_count += 1
+        return credits
 
-                self.all_credits.append(item)
-
-        return li
-
-    def get_tvshow_list(self):
-        tvshows = self.details['tv_credits']['cast']
-        tvshows = sort_dict(tvshows, 'first_air_date', True)
-        li = list()
-        duplicate_handler = list()
+    def _filter_tvshows(self,tvshows):
+        credits = list()
+        duplicate_handler = set()
 
         for item in tvshows:
             skip_show = False
@@ -149,23 +268,17 @@ class TMDBPersons(object):
                     skip_show = True
 
             if not skip_show and item['id'] not in duplicate_handler:
-                list_item, is_local = tmdb_handle_tvshow(item, self.local_shows)
-                li.append(list_item)
-                duplicate_handler.append(item['id'])
+                duplicate_handler.add(item['id'])
                 item['type'] = 'tvshow'
                 item['release_date'] = item['first_air_date']
+                credits.append(item)
 
-                if is_local:
-                    self.local_tv_count += 1
-
-                self.all_credits.append(item)
-
-        return li
+        return credits
 
     def get_person_images(self):
         li = list()
 
-        for item in self.details['images']['profiles']:
+        for item in self._get_credits().get('images', {}).get('profiles', []):
             list_item = tmdb_handle_images(item)
             li.append(list_item)
 
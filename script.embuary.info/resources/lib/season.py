@@ -10,6 +10,72 @@ import requests
 
 from resources.lib.helper import *
 from resources.lib.tmdb import *
+from resources.lib.append_planner import tmdb_get_title
+from resources.lib.tasks import get_task_pool, FetchPlan
+
+########################
+
+def tmdb_fetch_season(tmdb_id,season,show_error=True):
+    return tmdb_query(action='tv',
+                      call=tmdb_id,
+                      get='season',
+                      get2=season,
+                      params={'append_to_response': 'credits'},
+                      show_error=show_error
+                      )
+
+
+def tmdb_fetch_season_fallback(tmdb_id,season,details):
+    ''' Season in the fallback language, only if the overview is missing.
+    '''
+    if not details or DEFAULT_LANGUAGE == FALLBACK_LANGUAGE or details.get('overview'):
+        return
+
+    return tmdb_query(action='tv',
+                      call=tmdb_id,
+                      get='season',
+                      get2=season,
+                      use_language=False
+                      )
+
+
+def tmdb_merge_season(tmdb_id,season,details,fallback_details):
+    if fallback_details:
+        details['overview'] = fallback_details.get('overview')
+
+    write_cache('season' + str(season) + str(tmdb_id), details)
+
+    return details
+
+
+def tmdb_get_season(tmdb_id,season,show_error=True):
+    details = get_cache('season' + str(season) + str(tmdb_id))
+    if details:
+        return details
+
+    details = tmdb_fetch_season(tmdb_id, season, show_error)
+    if not details:
+        return
+
+    return tmdb_merge_season(tmdb_id, season, details, tmdb_fetch_season_fallback(tmdb_id, season, details))
+
+
+def tmdb_get_season_images(tmdb_id,season):
+    cache_key = 'images' + str(tmdb_id) + 'season' + str(season)
+    images = get_cache(cache_key)
+
+    if not images:
+        images = tmdb_query(action='tv',
+                            call=tmdb_id,
+                            get='season',
+                            get2=season,
+                            get3='images',
+                            params={'include_image_language': '%s,en,null' % DEFAULT_LANGUAGE}
+                            )
+
+        write_cache(cache_key,images)
+
+    return images
 
 ########################
 
@@ -20,57 +86,49 @@ class TMDBSeasons(object):
         self.season = call_request['season']
 
         if self.tmdb_id:
-            cache_key = 'season' + str(self.season) + str(self.tmdb_id)
-            self.details = get_cache(cache_key)
-
-            if not self.details:
-                self.details = tmdb_query(action='tv',
-                                          call=self.tmdb_id,
-                                          get='season',
-                                          get2=self.season,
-                                          params={'append_to_response': 'credits'},
-                                          show_error=True
-                                          )
+            self.plan = self._start_plan()
+            self.details = self.plan.result('season')
 
             if not self.details:
                 return
 
-            if DEFAULT_LANGUAGE != FALLBACK_LANGUAGE and not self.details['overview']:
-                fallback_details = tmdb_query(action='tv',
-                                                call=self.tmdb_id,
-                                                get='season',
-                                                get2=self.season,
-                                                use_language=False
-                                                )
-
-                self.details['overview'] = fallback_details.get('overview')
-
-            write_cache(cache_key,self.details)
+            if self.plan.has('fallback'):
+                self.details = tmdb_merge_season(self.tmdb_id, self.season, self.details, self.plan.result('fallback'))
 
-            self.tvshow_details = self.get_tvshow_details()
+            self.tvshow_details = self.plan.result('tvshow')
             self.person_duplicate_handler = list()
 
             self.result['details'] = self.get_details()
             self.result['cast'] = self.get_cast()
             self.result['gueststars'] = self.get_gueststars()
             self.result['posters'] = self.get_images()
+            self.result['adjacent'] = self.get_adjacent_seasons()
 
-    def __getitem__(self, key):
-        return self.result.get(key,'')
+    ''' Season, show header and images are requested together. The language fallback waits
+        for the season and is only requested if the overview is empty.
+    '''
+    def _start_plan(self):
+        plan = FetchPlan(get_task_pool())
+        cached = get_cache('season' + str(self.season) + str(self.tmdb_id))
 
-    def get_tvshow_details(self):
-        tvshow_cache_key = 'tv' + str(self.tmdb_id)
-        tvshow_details = get_cache(tvshow_cache_key)
+        if cached:
+            plan.add('season', lambda: cached)
+        else:
+            plan.add('season', lambda: tmdb_fetch_season(self.tmdb_id, self.season))
+            plan.add('fallback', lambda details: tmdb_fetch_season_fallback(self.tmdb_id, self.season, details), after=['season'])
 
-        if not tvshow_details:
-            tvshow_details = tmdb_query(action='tv',
-                                        call=self.tmdb_id,
-                                        params={'append_to_response': 'release_dates,content_ratings,external_ids,credits,videos,translations,similar'}
-                                        )
+        plan.add('tvshow', self.get_tvshow_details)
+        plan.add('images', lambda: tmdb_get_season_images(self.tmdb_id, self.season))
 
-            write_cache(tvshow_cache_key,tvshow_details)
+        return plan.start()
 
-        return tvshow_details
+    def __getitem__(self, key):
+        return self.result.get(key,'')
+
+    def get_tvshow_details(self):
+        # Documento da série compartilhado com o dialog da série: se ele já foi
+        # aberto, o cabeçalho não custa nenhuma requisição
+        return tmdb_get_title('tv', self.tmdb_id, 'header')
 
     def get_details(self):
         li = list()
@@ -105,24 +163,23 @@ class TMDBSeasons(object):
 
         return li
 
-    def get_images(self):
-        cache_key = 'images' + str(self.tmdb_id) + 'season' + str(self.season)
-        images = get_cache(cache_key)
-        li = list()
+    def get_adjacent_seasons(self):
+        ''' Previous and next season of the show (specials excluded), prefetched by the dialog.
+        '''
+        try:
+            current = int(self.season)
+            seasons = set(item['season_number'] for item in self.tvshow_details.get('seasons') or [] if item['season_number'] != 0)
+        except Exception:
+            return []
 
-        if not images:
-            images = tmdb_query(action='tv',
-                                call=self.tmdb_id,
-                                get='season',
-                                get2=self.season,
-                                get3='images',
-                                params={'include_image_language': '%s,en,null' % DEFAULT_LANGUAGE}
-                                )
+        return [season for season in (current + 1, current - 1) if season in seasons]
 
-            write_cache(cache_key,images)
+    def get_images(self):
+        images = self.plan.result('images') or {}
+        li = list()
 
-        for item in images['posters']:
+        for item in images.get('posters', []):
             list_item = tmdb_handle_images(item)
             li.append(list_item)
 
-        return li
\ No newline at end of file
+        return li
@@ -0,0 +1,315 @@
+#!/usr/bin/python
+# coding: utf-8
+
+########################
+
+import xbmc
+import time
+from threading import Lock, RLock
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait, TimeoutError
+
+########################
+
+class RateLimiter:
+    """
+    Token bucket thread-safe, compartilhado por todas as chamadas de uma API.
+
+    Features:
+    - Permite rajadas curtas (burst) e depois limita a 'rate' chamadas/s
+    - acquire() bloqueia só o tempo necessário para liberar o próximo token
+    """
+
+    def __init__(self, rate, burst):
+        """
+        Args:
+            rate: Chamadas por segundo em regime contínuo
+            burst: Número máximo de chamadas imediatas
+        """
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = Lock()
+
+    def acquire(self):
+        """Aguarda até existir um token disponível e o consome"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+class TaskPool:
+    """
+    Pool de threads compartilhado para requisições de rede em paralelo.
+
+    Importante: tarefas que rodam DENTRO de um pool não devem aguardar outras
+    tarefas do mesmo pool (risco de deadlock com o pool cheio).
+    """
+
+    def __init__(self, name, max_workers):
+        self.name = name
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+        xbmc.log('[script.embuary.info] TaskPool %s initialized with %d workers' % (name, max_workers), xbmc.LOGDEBUG)
+
+    def submit(self, fn, *args, **kwargs):
+        return self.executor.submit(fn, *args, **kwargs)
+
+    def race(self, calls, accept=bool, timeout=None):
+        """
+        Executa as funções em paralelo e retorna o primeiro resultado aceito.
+
+        Args:
+            calls: Lista de funções sem argumentos
+            accept: Critério de resultado válido (padrão: truthy)
+            timeout: Tempo máximo total em segundos
+
+        Returns:
+            Primeiro resultado aceito ou None. As tarefas perdedoras terminam
+            em background e seus resultados são descartados.
+        """
+        futures = [self.executor.submit(call) for call in calls]
+
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    xbmc.log('[script.embuary.info] %s race task error: %s' % (self.name, str(e)), xbmc.LOGDEBUG)
+                    continue
+
+                if accept(result):
+                    return result
+
+        except TimeoutError:
+            xbmc.log('[script.embuary.info] %s race timed out' % self.name, xbmc.LOGDEBUG)
+
+        return None
+
+    def map(self, fn, items, timeout=None):
+        """
+        Aplica fn a cada item em paralelo (concorrência limitada pelos workers).
+
+        Args:
+            fn: Função de um argumento
+            items: Itens de entrada
+            timeout: Tempo máximo total em segundos
+
+        Returns:
+            Lista de resultados na ordem de items. Itens com erro ou que não
+            terminaram dentro do timeout retornam None.
+        """
+        futures = [self.executor.submit(fn, item) for item in items]
+        done, not_done = wait(futures, timeout=timeout)
+
+        if not_done:
+            xbmc.log('[script.embuary.info] %s map timed out (%d of %d pending)' % (self.name, len(not_done), len(futures)), xbmc.LOGDEBUG)
+
+        results = []
+        for future in futures:
+            if future not in done:
+                future.cancel()
+                results.append(None)
+                continue
+
+            try:
+                results.append(future.result())
+            except Exception as e:
+                xbmc.log('[script.embuary.info] %s map task error: %s' % (self.name, str(e)), xbmc.LOGDEBUG)
+                results.append(None)
+
+        return results
+
+    def shutdown(self, wait=False):
+        self.executor.shutdown(wait=wait)
+
+class LazyResult:
+    """
+    Resultado com seções construídas sob demanda.
+
+    Features:
+    - Cada seção tem um builder, executado só no primeiro acesso (memoizado)
+    - Seções podem ser atribuídas diretamente (modos que constroem tudo)
+    - Thread-safe: dialog (GUI) e preenchimento em background podem pedir a
+      mesma seção; builders podem acessar outras seções (RLock)
+    - Um lock por seção: uma seção aguardando a rede não bloqueia as outras
+    """
+
+    def __init__(self):
+        self.builders = {}
+        self.values = {}
+        self.locks = {}
+        self.lock = Lock()
+
+    def _section_lock(self, key):
+        with self.lock:
+            lock = self.locks.get(key)
+            if lock is None:
+                lock = self.locks[key] = RLock()
+            return lock
+
+    def add(self, key, builder):
+        self.builders[key] = builder
+
+    def is_built(self, key):
+        return key in self.values
+
+    def get(self, key, default=''):
+        if key in self.values:
+            return self.values[key]
+
+        builder = self.builders.get(key)
+        if builder is None:
+            return default
+
+        with self._section_lock(key):
+            if key not in self.values:
+                try:
+                    self.values[key] = builder()
+                except Exception as e:
+                    xbmc.log('[script.embuary.info] LazyResult section %s failed: %s' % (key, str(e)), xbmc.LOGERROR)
+                    self.values[key] = default
+
+        return self.values[key]
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def __setitem__(self, key, value):
+        self.values[key] = value
+
+
+class FetchPlan:
+    """
+    Plano de requisições com dependências, executado em um TaskPool.
+
+    Cada etapa começa assim que as etapas das quais depende terminam, então a
+    latência total é a da cadeia mais longa e não a soma de todas as etapas.
+
+    Features:
+    - Etapas sem dependências começam juntas em start()
+    - Etapas dependentes recebem os resultados das anteriores como argumentos
+      (None se a etapa anterior falhou)
+    - As etapas nunca aguardam umas às outras dentro do pool (sem deadlock):
+      quem dispara a próxima etapa é o término da anterior
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.steps = {}
+        self.lock = Lock()
+
+    def add(self, name, fn, after=()):
+        """
+        Registra uma etapa.
+
+        Args:
+            name: Nome da etapa
+            fn: Função chamada com os resultados das etapas em 'after'
+            after: Nomes das etapas das quais esta depende (já registradas)
+
+        Returns:
+            Future com o resultado da etapa
+        """
+        future = Future()
+        self.steps[name] = {'fn': fn, 'after': tuple(after), 'future': future, 'started': False}
+        return future
+
+    def start(self):
+        for name in list(self.steps):
+            self._start_step(name)
+        return self
+
+    def _start_step(self, name):
+        step = self.steps[name]
+        depends = [self.steps[after]['future'] for after in step['after']]
+
+        with self.lock:
+            if step['started'] or not all(future.done() for future in depends):
+                return
+            step['started'] = True
+
+        args = [future.result() if not future.exception() else None for future in depends]
+        self.pool.submit(self._run_step, name, args)
+
+    def _run_step(self, name, args):
+        step = self.steps[name]
+
+        try:
+            step['future'].set_result(step['fn'](*args))
+        except Exception as e:
+            xbmc.log('[script.embuary.info] FetchPlan step %s failed: %s' % (name, str(e)), xbmc.LOGDEBUG)
+            step['future'].set_exception(e)
+
+        for other, other_step in self.steps.items():
+            if name in other_step['after']:
+                self._start_step(other)
+
+    def has(self, name):
+        return name in self.steps
+
+    def done(self, name):
+        """Indica se a etapa já terminou (sem aguardar)"""
+        return self.steps[name]['future'].done()
+
+    def result(self, name, timeout=None):
+        """Aguarda o resultado de uma etapa (None em caso de erro ou timeout)"""
+        try:
+            return self.steps[name]['future'].result(timeout=timeout)
+        except Exception:
+            return None
+
+########################
+
+# Limites compartilhados por processo (Trakt: 1000 GET / 5 min; TMDB: ~50/s por IP)
+TRAKT_LIMITER = RateLimiter(rate=3, burst=10)
+TMDB_LIMITER = RateLimiter(rate=20, burst=40)
+
+# Instância global
+_task_pool = None
+_task_pool_lock = Lock()
+
+def get_task_pool():
+    """Retorna instância singleton do pool de tarefas de rede"""
+    global _task_pool
+    if _task_pool is None:
+        with _task_pool_lock:
+            if _task_pool is None:
+                _task_pool = TaskPool('EmbuaryTasks', max_workers=8)
+    return _task_pool
+
+# Pool de baixa prioridade para pré-carregamentos especulativos (poucos workers
+# para não competir com as requisições que o usuário está aguardando)
+_prefetch_pool = None
+
+def get_prefetch_pool():
+    """Retorna instância singleton do pool de pré-carregamento"""
+    global _prefetch_pool
+    if _prefetch_pool is None:
+        with _task_pool_lock:
+            if _prefetch_pool is None:
+                _prefetch_pool = TaskPool('EmbuaryPrefetch', max_workers=2)
+    return _prefetch_pool
+
+# Pool dedicado a verificações leves (HEAD requests). Separado do pool principal
+# para que builders executados dentro dele possam usá-lo sem deadlock.
+_check_pool = None
+
+def get_check_pool():
+    """Retorna instância singleton do pool de verificações"""
+    global _check_pool
+    if _check_pool is None:
+        with _task_pool_lock:
+            if _check_pool is None:
+                _check_pool = TaskPool('EmbuaryChecks', max_workers=6)
+    return _check_pool
@@ -12,11 +12,14 @@ from urllib.parse import urlencode
 import os
 import json
 import time
+from threading import Lock
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from resources.lib.helper import *
 from resources.lib.omdb import *
 from resources.lib.localdb import *
+from resources.lib.models import *
+from resources.lib.tasks import get_task_pool, get_check_pool, TRAKT_LIMITER, TMDB_LIMITER
 
 ########################
 '''
@@ -46,10 +49,46 @@ IMG_PROFILE   = TMDB_IMG_BASE + 'h632'
 IMG_STILL     = TMDB_IMG_BASE + 'w300'    
 IMG_ORIGINAL  = TMDB_IMG_BASE + 'original' 
 
+YT_CHECK_TIMEOUT = 3
+YT_CHECK_CACHE_HOURS = 72
+
+# Tamanhos por contexto de exibição: 'list' (linhas de similares/coleção, créditos,
+# widgets) e 'detail' (item principal do dialog). 'large' = tamanhos antigos fixos.
+ART_TIERS = {
+    'small':  {'poster': 'w342', 'fanart': 'w780',  'profile': 'w185', 'still': 'w185'},
+    'medium': {'poster': 'w500', 'fanart': 'w1280', 'profile': 'w185', 'still': 'w300'},
+    'large':  {'poster': 'w780', 'fanart': 'w1280', 'profile': 'h632', 'still': 'w300'}
+}
+ART_CONTEXTS = {
+    'list': ART_TIERS.get(ADDON.getSettingString('art_size_list'), ART_TIERS['small']),
+    'detail': ART_TIERS.get(ADDON.getSettingString('art_size_detail'), ART_TIERS['large'])
+}
+
 # Preferência: usar a chave configurada nas settings (consistente com settings.xml).
 # Fallback: mantém a chave anterior caso a setting não exista/venha vazia.
 TRAKT_API_KEY = ADDON.getSettingString('trakt_api_key') or 'fbc2791a2609e77d4e9d1689b7332a7124428eb7d8ea46085876d8867755a357'
 
+# Cadeia de fallback das traduções: idioma configurado -> idioma base -> inglês (-> original)
+TRANSLATION_CHAIN = tuple(dict.fromkeys([DEFAULT_LANGUAGE, DEFAULT_LANGUAGE[:2], FALLBACK_LANGUAGE]))
+TRANSLATION_LANGUAGES = set(language[:2] for language in TRANSLATION_CHAIN)
+TRANSLATION_INDEX_KEY = 'translation_index'
+
+# Poda dos payloads antes do cache: só os campos que os builders leem.
+# Ao mudar a poda, incremente TMDB_SCHEMA_VERSION. Documentos de versões em
+# TMDB_SCHEMA_TRIMMABLE (a nova poda só remove campos em relação a elas) são
+# atualizados no load; os demais são descartados e buscados de novo.
+TMDB_SCHEMA_VERSION = 1
+TMDB_SCHEMA_KEY = 'schema_version'
+TMDB_SCHEMA_TRIMMABLE = (None,)
+
+CREW_JOBS = ('Creator', 'Director', 'Producer', 'Screenplay', 'Writer', 'Original Music Composer', 'Novel', 'Storyboard', 'Executive Producer', 'Comic Book')
+TRIM_CAST_FIELDS = ('id', 'name', 'character', 'profile_path', 'known_for_department', 'order')
+TRIM_CREW_FIELDS = ('id', 'name', 'job', 'department', 'profile_path')
+TRIM_IMAGE_FIELDS = ('file_path', 'width', 'height', 'iso_639_1')
+TRIM_VIDEO_FIELDS = ('key', 'name', 'site', 'type', 'iso_639_1')
+TRIM_SIMILAR_FIELDS = ('id', 'title', 'original_title', 'name', 'original_name', 'overview', 'release_date', 'first_air_date',
+                       'poster_path', 'backdrop_path', 'vote_average', 'vote_count')
+
 CACHE_DIR = xbmcvfs.translatePath('special://profile/addon_data/script.embuary.info/')
 CACHE_FILE = os.path.join(CACHE_DIR, 'trakt_cache.json')
 CACHE_MAX_AGE = 30 * 24 * 60 * 60  # 30 dias em segundos
@@ -58,6 +97,12 @@ CACHE_MAX_AGE = 30 * 24 * 60 * 60  # 30 dias em segundos
 
 session = requests.Session()
 
+def tmdb_art(path,kind,context='list'):
+    if not path:
+        return ''
+    return TMDB_IMG_BASE + ART_CONTEXTS[context][kind] + path
+
+
 def tmdb_query(action,call=None,get=None,get2=None,get3=None,get4=None,params=None,use_language=True,language=DEFAULT_LANGUAGE,show_error=False):
     urlargs = {}
     urlargs['api_key'] = API_KEY
@@ -76,8 +121,9 @@ def tmdb_query(action,call=None,get=None,get2=None,get3=None,get4=None,params=No
 
         for i in range(1,3): # loop if heavy server load (reduzido de 3 para 2 tentativas)
             try:
+                TMDB_LIMITER.acquire()
                 request = session.get(url, timeout=3)
-                if str(request.status_code).startswith('5'):
+                if str(request.status_code).startswith('5') or request.status_code == 429:
                     raise Exception(str(request.status_code))
                 else:
                     break
@@ -97,6 +143,9 @@ def tmdb_query(action,call=None,get=None,get2=None,get3=None,get4=None,params=No
 
         result = request.json()
 
+        if isinstance(result, dict) and 'translations' in result:
+            tmdb_index_translations(result)
+
         if show_error:
             if len(result) == 0 or ('results' in result and not len(result['results']) == 0):
                 error = ADDON.getLocalizedString(32019)
@@ -169,28 +218,28 @@ def tmdb_select_dialog(list,call):
         img = 'profile_path'
         label = 'name'
         label2 = ''
-        base_img = IMG_PROFILE
+        art_kind = 'profile'
 
     elif call == 'movie':
         default_img = 'DefaultVideo.png'
         img = 'poster_path'
         label = 'title'
         label2 = 'tmdb_get_year(item.get("release_date", ""))'
-        base_img = IMG_POSTER
+        art_kind = 'poster'
 
     elif call == 'tv':
         default_img = 'DefaultVideo.png'
         img = 'poster_path'
         label = 'name'
         label2 = 'tmdb_get_year(item.get("first_air_date", ""))'
-        base_img = IMG_POSTER
+        art_kind = 'poster'
 
     else:
         return
 
     index = 0
     for item in list:
-        icon = base_img + item[img] if item[img] is not None else ''
+        icon = tmdb_art(item[img], art_kind)
         list_item = xbmcgui.ListItem(item[label])
         list_item.setArt({'icon': default_img, 'thumb': icon})
 
@@ -329,7 +378,7 @@ def tmdb_check_localdb(local_items,title,originaltitle,year,imdbnumber=False):
     return local
 
 
-def tmdb_handle_person(item):
+def tmdb_handle_person(item,art_context='list'):
     if item.get('gender') == 2:
         gender = 'male'
     elif item.get('gender') == 1:
@@ -337,8 +386,8 @@ def tmdb_handle_person(item):
     else:
         gender = ''
 
-    icon = IMG_PROFILE + item['profile_path'] if item['profile_path'] is not None else ''
-    list_item = xbmcgui.ListItem(label=item['name'])
+    icon = tmdb_art(item['profile_path'], 'profile', art_context)
+    list_item = Person(label=item['name'])
     list_item.setProperty('birthyear', date_year(item.get('birthday', '')))
     list_item.setProperty('birthday', date_format(item.get('birthday', '')))
     list_item.setProperty('deathday', date_format(item.get('deathday', '')))
@@ -357,6 +406,8 @@ def tmdb_handle_person(item):
 # CACHE PERSISTENTE TRAKT
 # =======================
 
+TRAKT_CACHE_LOCK = Lock()
+
 def _load_trakt_cache():
     if not os.path.exists(CACHE_FILE):
         return {'slug_map': {}, 'reviews': {}}
@@ -386,12 +437,43 @@ def _save_trakt_cache(cache):
     except Exception as e:
         xbmc.log(f"[Trakt] Error saving cache: {str(e)}", xbmc.LOGDEBUG)
 
+def _trakt_cache_mtime():
+    try:
+        return os.path.getmtime(CACHE_FILE)
+    except OSError:
+        return 0
+
 TRAKT_CACHE = _load_trakt_cache()
+TRAKT_CACHE_MTIME = _trakt_cache_mtime()
+
+def _refresh_trakt_cache():
+    ''' Service e script são processos diferentes e gravam o mesmo arquivo
+        (ex: reviews pré-carregadas pelo service). Mescla o que estiver no disco
+        sem sobrescrever entradas que já estão em memória. Chamar com o lock.
+    '''
+    global TRAKT_CACHE_MTIME
+    mtime = _trakt_cache_mtime()
+    if not mtime or mtime == TRAKT_CACHE_MTIME:
+        return
+
+    disk_cache = _load_trakt_cache()
+    for section in ['slug_map', 'reviews']:
+        merged = disk_cache.get(section, {})
+        merged.update(TRAKT_CACHE.get(section, {}))
+        TRAKT_CACHE[section] = merged
+
+    TRAKT_CACHE_MTIME = mtime
+
+def _write_trakt_cache():
+    global TRAKT_CACHE_MTIME
+    _save_trakt_cache(TRAKT_CACHE)
+    TRAKT_CACHE_MTIME = _trakt_cache_mtime()
 
 def clear_trakt_cache():
     global TRAKT_CACHE
-    TRAKT_CACHE = {'slug_map': {}, 'reviews': {}}
-    _save_trakt_cache(TRAKT_CACHE)
+    with TRAKT_CACHE_LOCK:
+        TRAKT_CACHE = {'slug_map': {}, 'reviews': {}}
+        _write_trakt_cache()
 
 def _set_cache(section, key, value):
     now = time.time()
@@ -399,22 +481,47 @@ def _set_cache(section, key, value):
         value = {'value': value, 'ts': now}
     else:
         value['ts'] = now
-    TRAKT_CACHE[section][key] = value
-    _save_trakt_cache(TRAKT_CACHE)
+    with TRAKT_CACHE_LOCK:
+        _refresh_trakt_cache()
+        TRAKT_CACHE[section][key] = value
+        _write_trakt_cache()
 
 def _get_cache(section, key):
     entry = TRAKT_CACHE.get(section, {}).get(key)
+    if not entry and _trakt_cache_mtime() != TRAKT_CACHE_MTIME:
+        # Só relê o arquivo (com o lock) se outro processo o alterou
+        with TRAKT_CACHE_LOCK:
+            _refresh_trakt_cache()
+        entry = TRAKT_CACHE.get(section, {}).get(key)
     if not entry:
         return None
     if isinstance(entry, dict) and 'value' in entry:
         ts = entry.get('ts', 0)
         if ts and time.time() - ts > CACHE_MAX_AGE:
-            del TRAKT_CACHE[section][key]
-            _save_trakt_cache(TRAKT_CACHE)
+            with TRAKT_CACHE_LOCK:
+                TRAKT_CACHE[section].pop(key, None)
+                _write_trakt_cache()
             return None
         return entry['value']
     return entry
 
+# =======================
+# TRAKT
+# =======================
+
+TRAKT_HEADERS = {
+    'Content-Type': 'application/json',
+    'trakt-api-version': '2',
+    'trakt-api-key': TRAKT_API_KEY
+}
+TRAKT_TIMEOUT = 3
+TRAKT_COMMENTS_PAGE_SIZE = 50
+TRAKT_COMMENTS_MAX_PAGES = 4  # no máximo 200 comentários, como antes
+
+def _trakt_get(url, params=None):
+    TRAKT_LIMITER.acquire()
+    return session.get(url, headers=TRAKT_HEADERS, params=params, timeout=TRAKT_TIMEOUT)
+
 def trakt_get_slug_from_tmdb_id(item_id, media_type='movie'):
     cache_key = f"{media_type}_{item_id}"
     cached = _get_cache('slug_map', cache_key)
@@ -426,14 +533,9 @@ def trakt_get_slug_from_tmdb_id(item_id, media_type='movie'):
         return str(item_id)
 
     url = f"https://api.trakt.tv/search/tmdb/{item_id}?type={media_type}"
-    headers = {
-        'Content-Type': 'application/json',
-        'trakt-api-version': '2',
-        'trakt-api-key': TRAKT_API_KEY
-    }
 
     try:
-        response = session.get(url, headers=headers, timeout=1)
+        response = _trakt_get(url)
         if response.status_code == 200:
             results = response.json()
             if results:
@@ -447,6 +549,62 @@ def trakt_get_slug_from_tmdb_id(item_id, media_type='movie'):
     _set_cache('slug_map', cache_key, None)
     return None
 
+def _trakt_format_comment(c):
+    comment_text = c.get('comment', '').replace('\n', ' ').strip()
+    is_spoiler = c.get('spoiler', False)
+    user_lang = c.get('user', {}).get('language', 'en')
+
+    if is_spoiler or len(comment_text) > 600 or user_lang not in ('pt', 'en', 'es'):
+        return None
+
+    review_block = f"[B][COLOR FFE50914]ANÁLISE:[/COLOR][/B] {comment_text}"
+    user_rating = c.get('user_rating')
+    if user_rating is not None:
+         review_block += f"  [B]NOTA: {user_rating}/10[/B]"
+
+    return review_block
+
+def _trakt_fetch_comments(path, max_comments=20):
+    ''' Pagina os comentários e para assim que houver max_comments válidos.
+        Retorna None em erro ou resposta diferente de 200 (ex: 429), para que
+        a falha não seja gravada no cache como título sem reviews. 404 é o
+        título ausente no Trakt: sem comentários, não uma falha.
+    '''
+    comments = []
+    url = f"https://api.trakt.tv/{path}/comments"
+
+    try:
+        for page in range(1, TRAKT_COMMENTS_MAX_PAGES + 1):
+            response = _trakt_get(url, params={'limit': TRAKT_COMMENTS_PAGE_SIZE, 'sort': 'likes', 'page': page})
+            if response.status_code == 404:
+                break
+            if response.status_code != 200:
+                xbmc.log(f"[Trakt] Reviews for {path} not available: HTTP {response.status_code}", xbmc.LOGDEBUG)
+                return None
+
+            data = response.json()
+            for c in data:
+                formatted = _trakt_format_comment(c)
+                if formatted:
+                    comments.append(formatted)
+                    if len(comments) >= max_comments:
+                        return comments
+
+            page_count = response.headers.get('X-Pagination-Page-Count')
+            if len(data) < TRAKT_COMMENTS_PAGE_SIZE or (page_count and page >= int(page_count)):
+                break
+
+    except Exception as e:
+        xbmc.log(f"[Trakt] Error getting reviews for {path}: {str(e)}", xbmc.LOGDEBUG)
+        return None
+
+    return comments
+
+def tmdb_get_cached_reviews(item_id, media_type='movie'):
+    ''' Retorna None se ainda não houver reviews em cache para o item
+    '''
+    return _get_cache('reviews', f"{media_type}_{item_id}")
+
 def tmdb_get_combined_reviews(item_id, media_type='movie', max_comments=20):
     cache_key = f"{media_type}_{item_id}"
     cached = _get_cache('reviews', cache_key)
@@ -454,84 +612,40 @@ def tmdb_get_combined_reviews(item_id, media_type='movie', max_comments=20):
         return cached
 
     trakt_type = 'movies' if media_type == 'movie' else 'shows'
-    headers = {
-        'Content-Type': 'application/json',
-        'trakt-api-version': '2',
-        'trakt-api-key': TRAKT_API_KEY
-    }
-    params = {'limit': 200, 'sort': 'likes'}
-
-    def fmt(c):
-        comment_text = c.get('comment', '').replace('\n', ' ').strip()
-        is_spoiler = c.get('spoiler', False)
-        user_lang = c.get('user', {}).get('language', 'en')
-        
-        if is_spoiler or len(comment_text) > 600 or user_lang not in ('pt', 'en', 'es'):
-            return None
-
-        review_block = f"[B][COLOR FFE50914]ANÁLISE:[/COLOR][/B] {comment_text}"
-        user_rating = c.get('user_rating')
-        if user_rating is not None:
-             review_block += f"  [B]NOTA: {user_rating}/10[/B]"
-             
-        return review_block
+    fetched = []
 
-    comments = []
     if str(item_id).isdigit():
-        url = f"https://api.trakt.tv/{trakt_type}/tmdb/{item_id}/comments"
-        try:
-            response = session.get(url, headers=headers, params=params, timeout=1)
-            if response.status_code == 200:
-                data = response.json()
-                # Apply filter and limit
-                valid_comments = []
-                for c in data:
-                    formatted = fmt(c)
-                    if formatted:
-                        valid_comments.append(formatted)
-                        if len(valid_comments) >= 20: break
-                comments = valid_comments
-        except Exception as e:
-            xbmc.log(f"[Trakt] Error getting reviews by TMDB id: {str(e)}", xbmc.LOGDEBUG)
-
-        if not comments:
+        def by_tmdb_id():
+            comments = _trakt_fetch_comments(f"{trakt_type}/tmdb/{item_id}", max_comments)
+            fetched.append(comments)
+            return comments
+
+        def by_slug():
             slug = trakt_get_slug_from_tmdb_id(item_id, media_type)
+            comments = []
             if slug and slug != str(item_id):
-                url = f"https://api.trakt.tv/{trakt_type}/{slug}/comments"
-                try:
-                    response = session.get(url, headers=headers, params=params, timeout=1)
-                    if response.status_code == 200:
-                        data = response.json()
-                        valid_comments = []
-                        for c in data:
-                            formatted = fmt(c)
-                            if formatted:
-                                valid_comments.append(formatted)
-                                if len(valid_comments) >= 20: break
-                        comments = valid_comments
-                except Exception as e:
-                    xbmc.log(f"[Trakt] Error getting reviews by slug: {str(e)}", xbmc.LOGDEBUG)
+                comments = _trakt_fetch_comments(f"{trakt_type}/{slug}", max_comments)
+            fetched.append(comments)
+            return comments
+
+        # Os dois caminhos correm em paralelo; vence o primeiro com comentários
+        paths = 2
+        comments = get_task_pool().race([by_tmdb_id, by_slug])
     else:
-        url = f"https://api.trakt.tv/{trakt_type}/{item_id}/comments"
-        try:
-            response = session.get(url, headers=headers, params=params, timeout=1)
-            if response.status_code == 200:
-                data = response.json()
-                valid_comments = []
-                for c in data:
-                    formatted = fmt(c)
-                    if formatted:
-                        valid_comments.append(formatted)
-                        if len(valid_comments) >= 20: break
-                comments = valid_comments
-        except Exception as e:
-            xbmc.log(f"[Trakt] Error getting reviews by slug: {str(e)}", xbmc.LOGDEBUG)
+        paths = 1
+        comments = _trakt_fetch_comments(f"{trakt_type}/{item_id}", max_comments)
+        fetched.append(comments)
+
+    # Sem comentários, o vazio só vai para o cache se todos os caminhos
+    # responderam 200. Uma falha é tentada de novo na próxima leitura
+    if not comments and (None in fetched or len(fetched) < paths):
+        return ''
 
     result = '\n\n'.join(comments) if comments else ''
     _set_cache('reviews', cache_key, result)
     return result
 
-def tmdb_get_combined_reviews_parallel(item_ids, media_type='movie', max_comments=10):
+def tmdb_get_combined_reviews_parallel(item_ids, media_type='movie', max_comments=20):
     futures = {}
     results = {}
 
@@ -551,9 +665,10 @@ def tmdb_get_combined_reviews_parallel(item_ids, media_type='movie', max_comment
     return results
 
 
-def tmdb_handle_movie(item, local_items=None, full_info=False, mediatype='movie', fetch_reviews=False):
-    icon = IMG_POSTER + item['poster_path'] if item['poster_path'] is not None else ''
-    backdrop = IMG_FANART + item['backdrop_path'] if item['backdrop_path'] is not None else ''
+def tmdb_handle_movie(item, local_items=None, full_info=False, mediatype='movie', fetch_reviews=False, art_context=None, omdb=True):
+    art_context = art_context or ('detail' if full_info else 'list')
+    icon = tmdb_art(item['poster_path'], 'poster', art_context)
+    backdrop = tmdb_art(item['backdrop_path'], 'fanart', art_context)
 
     label = item['title'] or item['original_title']
     originaltitle = item.get('original_title', '')
@@ -569,7 +684,7 @@ def tmdb_handle_movie(item, local_items=None, full_info=False, mediatype='movie'
     dbid = local_info['dbid']
     is_local = True if dbid > 0 else False
 
-    list_item = xbmcgui.ListItem(label=label)
+    list_item = Movie(label=label)
     list_item.setInfo('video', {
         'title': label,
         'originaltitle': originaltitle,
@@ -602,7 +717,8 @@ def tmdb_handle_movie(item, local_items=None, full_info=False, mediatype='movie'
 
     if full_info:
         tmdb_studios(list_item, item, 'production')
-        omdb_properties(list_item, imdbnumber)
+        if omdb:
+            omdb_properties(list_item, imdbnumber)
 
         region_release = tmdb_get_region_release(item)
         if premiered != region_release:
@@ -611,10 +727,8 @@ def tmdb_handle_movie(item, local_items=None, full_info=False, mediatype='movie'
         if collection:
             list_item.setProperty('collection', collection['name'])
             list_item.setProperty('collection_id', str(collection['id']))
-            list_item.setProperty('collection_poster',
-                                  IMG_POSTER + collection['poster_path'] if collection['poster_path'] is not None else '')
-            list_item.setProperty('collection_fanart',
-                                  IMG_FANART + collection['backdrop_path'] if collection['backdrop_path'] is not None else '')
+            list_item.setProperty('collection_poster', tmdb_art(collection['poster_path'], 'poster', art_context))
+            list_item.setProperty('collection_fanart', tmdb_art(collection['backdrop_path'], 'fanart', art_context))
 
     if fetch_reviews and item.get('id'):
         combined_review = tmdb_get_combined_reviews(item['id'], media_type='movie')
@@ -630,9 +744,10 @@ def tmdb_handle_movie(item, local_items=None, full_info=False, mediatype='movie'
     return list_item, is_local
 
 
-def tmdb_handle_tvshow(item, local_items=None, full_info=False, mediatype='tv', fetch_reviews=False):
-    icon = IMG_POSTER + item['poster_path'] if item['poster_path'] is not None else ''
-    backdrop = IMG_FANART + item['backdrop_path'] if item['backdrop_path'] is not None else ''
+def tmdb_handle_tvshow(item, local_items=None, full_info=False, mediatype='tv', fetch_reviews=False, art_context=None, omdb=True):
+    art_context = art_context or ('detail' if full_info else 'list')
+    icon = tmdb_art(item['poster_path'], 'poster', art_context)
+    backdrop = tmdb_art(item['backdrop_path'], 'fanart', art_context)
 
     label = item['name'] or item['original_name']
     originaltitle = item.get('original_name', '')
@@ -649,7 +764,7 @@ def tmdb_handle_tvshow(item, local_items=None, full_info=False, mediatype='tv',
     dbid = local_info['dbid']
     is_local = True if dbid > 0 else False
 
-    list_item = xbmcgui.ListItem(label=label)
+    list_item = TVShow(label=label)
     list_item.setInfo('video', {
         'title': label,
         'originaltitle': originaltitle,
@@ -682,7 +797,8 @@ def tmdb_handle_tvshow(item, local_items=None, full_info=False, mediatype='tv',
     if full_info:
         tmdb_studios(list_item, item, 'production')
         tmdb_studios(list_item, item, 'network')
-        omdb_properties(list_item, imdbnumber)
+        if omdb:
+            omdb_properties(list_item, imdbnumber)
 
         if last_episode:
             list_item.setProperty('lastepisode', last_episode.get('name'))
@@ -690,8 +806,7 @@ def tmdb_handle_tvshow(item, local_items=None, full_info=False, mediatype='tv',
             list_item.setProperty('lastepisode_number', str(last_episode.get('episode_number')))
             list_item.setProperty('lastepisode_season', str(last_episode.get('season_number')))
             list_item.setProperty('lastepisode_date', date_format(last_episode.get('air_date')))
-            list_item.setProperty('lastepisode_thumb',
-                                  IMG_STILL + last_episode['still_path'] if last_episode['still_path'] is not None else '')
+            list_item.setProperty('lastepisode_thumb', tmdb_art(last_episode['still_path'], 'still', art_context))
 
         if next_episode:
             list_item.setProperty('nextepisode', next_episode.get('name'))
@@ -699,8 +814,7 @@ def tmdb_handle_tvshow(item, local_items=None, full_info=False, mediatype='tv',
             list_item.setProperty('nextepisode_number', str(next_episode.get('episode_number')))
             list_item.setProperty('nextepisode_season', str(next_episode.get('season_number')))
             list_item.setProperty('nextepisode_date', date_format(next_episode.get('air_date')))
-            list_item.setProperty('nextepisode_thumb',
-                                  IMG_STILL + next_episode['still_path'] if next_episode['still_path'] is not None else '')
+            list_item.setProperty('nextepisode_thumb', tmdb_art(next_episode['still_path'], 'still', art_context))
 
     if fetch_reviews and item.get('id'):
         combined_review = tmdb_get_combined_reviews(item['id'], media_type='tv')
@@ -710,11 +824,12 @@ def tmdb_handle_tvshow(item, local_items=None, full_info=False, mediatype='tv',
 
 
 
-def tmdb_handle_season(item,tvshow_details,full_info=False):
-    backdrop = IMG_FANART + tvshow_details['backdrop_path'] if tvshow_details['backdrop_path'] is not None else ''
-    icon = IMG_POSTER + item['poster_path'] if item['poster_path'] is not None else ''
+def tmdb_handle_season(item,tvshow_details,full_info=False,art_context=None):
+    art_context = art_context or ('detail' if full_info else 'list')
+    backdrop = tmdb_art(tvshow_details['backdrop_path'], 'fanart', art_context)
+    icon = tmdb_art(item['poster_path'], 'poster', art_context)
     if not icon and tvshow_details['poster_path']:
-        icon = IMG_POSTER + tvshow_details['poster_path']
+        icon = tmdb_art(tvshow_details['poster_path'], 'poster', art_context)
 
     imdbnumber = tvshow_details['external_ids']['imdb_id'] if tvshow_details.get('external_ids') else ''
     season_nr = str(item.get('season_number', ''))
@@ -722,7 +837,7 @@ def tmdb_handle_season(item,tvshow_details,full_info=False):
 
     episodes_count = len(item.get('episodes', []))
 
-    list_item = xbmcgui.ListItem(label=tvshow_label)
+    list_item = Season(label=tvshow_label)
     list_item.setInfo('video', {'title': item['name'],
                                 'tvshowtitle': tvshow_label,
                                 'premiered': item.get('air_date', ''),
@@ -751,20 +866,28 @@ def tmdb_handle_season(item,tvshow_details,full_info=False):
 
 def tmdb_fallback_info(item,key):
     if FALLBACK_LANGUAGE == DEFAULT_LANGUAGE:
-        try:
-            key_value = item.get(key, '').replace('&amp;', '&').strip()
-        except Exception:
-            key_value = ''
-    else:
-        key_value = tmdb_get_translation(item, key, DEFAULT_LANGUAGE)
+        key_value = _tmdb_clean_text(item.get(key))
+        if key_value:
+            return key_value
 
-    if not key_value:
-        key_value = tmdb_get_translation(item, key, FALLBACK_LANGUAGE)
+    index = tmdb_index_translations(item)
 
-    return key_value
+    for language in TRANSLATION_CHAIN:
+        key_value = index.get(language, {}).get(key)
+        if key_value:
+            return key_value
+
+    return _tmdb_clean_text(item.get(key))
 
 
 def tmdb_get_translation(item,key,language):
+    index = tmdb_index_translations(item)
+
+    if language in index or language[:2] in index:
+        return index.get(language, {}).get(key) or index.get(language[:2], {}).get(key, '')
+
+    ''' Language is not part of the index (not used by the fallback chain). Scan the raw list.
+    '''
     key_value_iso_639_1 = ""
     try:
         language_iso_639_1 = language[:2]
@@ -772,9 +895,8 @@ def tmdb_get_translation(item,key,language):
 
         for translation in item['translations']['translations']:
             if translation.get('iso_639_1') == language_iso_639_1 and translation['data'][key]:
-                key_value = translation['data'][key]
+                key_value = _tmdb_clean_text(translation['data'][key])
                 if key_value:
-                    key_value = key_value.replace('&amp;', '&').strip()
                     if not language_iso_3166_1 or language_iso_3166_1 == translation.get('iso_3166_1'):
                         return key_value
                     else:
@@ -785,18 +907,134 @@ def tmdb_get_translation(item,key,language):
     return key_value_iso_639_1
 
 
-def tmdb_handle_images(item):
-    icon = IMG_ORIGINAL + item['file_path'] if item['file_path'] is not None else ''
-    list_item = xbmcgui.ListItem(label=str(item['width']) + 'x' + str(item['height']) + 'px')
-    list_item.setArt({'icon': 'DefaultPicture.png', 'thumb': icon})
+def tmdb_index_translations(item):
+    ''' Builds the translation index ({language: {field: value}}) once per response and
+        stores it on the item, so it is cached together with the response. Only the
+        languages of the fallback chain are indexed and kept in the raw translations list.
+    '''
+    try:
+        index = item.get(TRANSLATION_INDEX_KEY)
+    except AttributeError:
+        return {}
+
+    if index is not None:
+        return index
+
+    index = {}
+
+    try:
+        translations = item['translations']['translations']
+        used_translations = []
+
+        for translation in translations:
+            language = translation.get('iso_639_1')
+            if language not in TRANSLATION_LANGUAGES:
+                continue
+
+            used_translations.append(translation)
+            region = translation.get('iso_3166_1')
+
+            for index_key in (language + '-' + region if region else None, language):
+                if index_key not in TRANSLATION_CHAIN:
+                    continue
+
+                fields = index.setdefault(index_key, {})
+                for field, value in (translation.get('data') or {}).items():
+                    if field not in fields and isinstance(value, str):
+                        value = _tmdb_clean_text(value)
+                        if value:
+                            fields[field] = value
+
+        item['translations']['translations'] = used_translations
+
+    except Exception:
+        pass
+
+    item[TRANSLATION_INDEX_KEY] = index
+    return index
+
+
+def tmdb_trim_payload(item,media_type):
+    ''' Drops everything the builders never read before the response is cached: crew outside
+        CREW_JOBS/Writing, unused credit/image/video fields, logos, release dates and content
+        ratings of other countries, similar pages metadata. Works in place and is idempotent.
+    '''
+    if not isinstance(item, dict):
+        return item
+
+    if media_type == 'person':
+        for credits in ('movie_credits', 'tv_credits'):
+            if item.get(credits):
+                item[credits].pop('crew', None)
+
+        if item.get('images'):
+            item['images'] = {'profiles': _tmdb_trim_list(item['images'].get('profiles'), TRIM_IMAGE_FIELDS)}
+
+    else:
+        credits = item.get('credits')
+        if credits:
+            item['credits'] = {'cast': _tmdb_trim_list(credits.get('cast'), TRIM_CAST_FIELDS),
+                               'crew': _tmdb_trim_list([crew for crew in credits.get('crew') or []
+                                                        if crew.get('job') in CREW_JOBS or crew.get('department') == 'Writing'],
+                                                       TRIM_CREW_FIELDS)}
+
+        for key in ('release_dates', 'content_ratings'):
+            if item.get(key):
+                item[key] = {'results': [result for result in item[key].get('results') or []
+                                         if result.get('iso_3166_1') in (COUNTRY_CODE, 'US')]}
+
+        if item.get('images'):
+            item['images'] = {'backdrops': _tmdb_trim_list(item['images'].get('backdrops'), TRIM_IMAGE_FIELDS),
+                              'posters': _tmdb_trim_list(item['images'].get('posters'), TRIM_IMAGE_FIELDS)}
+
+        if item.get('videos'):
+            item['videos'] = {'results': _tmdb_trim_list(item['videos'].get('results'), TRIM_VIDEO_FIELDS)}
+
+        if item.get('similar'):
+            item['similar'] = {'results': _tmdb_trim_list(item['similar'].get('results'), TRIM_SIMILAR_FIELDS)}
+
+    item[TMDB_SCHEMA_KEY] = TMDB_SCHEMA_VERSION
+    return item
+
+
+def tmdb_upgrade_payload(item,media_type):
+    ''' Returns the cached payload in the current schema, or None if it has to be fetched again.
+    '''
+    version = item.get(TMDB_SCHEMA_KEY)
+
+    if version == TMDB_SCHEMA_VERSION:
+        return item
+
+    if version in TMDB_SCHEMA_TRIMMABLE:
+        return tmdb_trim_payload(item, media_type)
+
+
+def _tmdb_trim_list(items,fields):
+    return [dict((field, entry[field]) for field in fields if field in entry) for entry in items or []]
+
+
+def _tmdb_clean_text(value):
+    try:
+        return value.replace('&amp;', '&').strip()
+    except Exception:
+        return ''
+
+
+def tmdb_handle_images(item,art_context='list'):
+    ''' Thumb in the tier size of the context, the original file is only used by the fullscreen slideshow.
+    '''
+    original = IMG_ORIGINAL + item['file_path'] if item['file_path'] is not None else ''
+    icon = tmdb_art(item['file_path'], 'fanart' if item['width'] > item['height'] else 'poster', art_context)
+    list_item = Image(label=str(item['width']) + 'x' + str(item['height']) + 'px')
+    list_item.setArt({'icon': 'DefaultPicture.png', 'thumb': icon, 'original': original})
     list_item.setProperty('call', 'image')
 
     return list_item
 
 
-def tmdb_handle_credits(item):
-    icon = IMG_PROFILE + item['profile_path'] if item['profile_path'] is not None else ''
-    list_item = xbmcgui.ListItem(label=item['name'])
+def tmdb_handle_credits(item,art_context='list'):
+    icon = tmdb_art(item['profile_path'], 'profile', art_context)
+    list_item = Credit(label=item['name'])
     list_item.setLabel2(item['label2'])
     list_item.setArt({'icon': 'DefaultActor.png', 'thumb': icon, 'poster': icon})
     list_item.setProperty('id', str(item.get('id', '')))
@@ -807,7 +1045,7 @@ def tmdb_handle_credits(item):
 
 def tmdb_handle_yt_videos(item):
     icon = 'https://img.youtube.com/vi/%s/0.jpg' % str(item['key'])
-    list_item = xbmcgui.ListItem(label=item['name'])
+    list_item = Video(label=item['name'])
     list_item.setLabel2(item.get('type', ''))
     list_item.setArt({'icon': 'DefaultVideo.png', 'thumb': icon, 'landscape': icon})
     list_item.setProperty('ytid', str(item['key']))
@@ -816,6 +1054,46 @@ def tmdb_handle_yt_videos(item):
     return list_item
 
 
+def tmdb_yt_available(keys):
+    ''' Checks the YouTube thumbnail of every key in parallel. Results are cached per video key,
+        so the same trailer is only checked once for all titles. Keys that could not be checked
+        (timeout, network error) are treated as available and not cached.
+    '''
+    available = set()
+    pending = []
+
+    for key in dict.fromkeys(keys):
+        cached = get_cache('ytcheck' + key)
+        if cached:
+            if cached['ok']:
+                available.add(key)
+        else:
+            pending.append(key)
+
+    if pending:
+        results = get_check_pool().map(_tmdb_yt_check, pending, timeout=YT_CHECK_TIMEOUT * 2)
+
+        for key, ok in zip(pending, results):
+            if ok is None:
+                available.add(key)
+                continue
+
+            write_cache('ytcheck' + key, {'ok': ok}, YT_CHECK_CACHE_HOURS)
+            if ok:
+                available.add(key)
+
+    return available
+
+
+def _tmdb_yt_check(key):
+    try:
+        request = requests.head('https://img.youtube.com/vi/%s/0.jpg' % key, timeout=YT_CHECK_TIMEOUT)
+    except requests.exceptions.RequestException:
+        return None
+
+    return request.status_code == requests.codes.ok
+
+
 def tmdb_join_items_by(item,key_is,value_is,key='name'):
     values = []
     for value in item:
@@ -912,21 +1190,24 @@ def tmdb_get_cert(item):
 
 def omdb_properties(list_item,imdbnumber):
     if OMDB_API_KEY and imdbnumber:
-        omdb = omdb_api(imdbnumber)
-        if omdb:
-            list_item.setProperty('rating.metacritic', omdb.get('metacritic', ''))
-            list_item.setProperty('rating.rotten', omdb.get('tomatometerallcritics', ''))
-            list_item.setProperty('rating.rotten_avg', omdb.get('tomatometerallcritics_avg', ''))
-            list_item.setProperty('votes.rotten', omdb.get('tomatometerallcritics_votes', ''))
-            list_item.setProperty('rating.rotten_user', omdb.get('tomatometerallaudience', ''))
-            list_item.setProperty('rating.rotten_user_avg', omdb.get('tomatometerallaudience_avg', ''))
-            list_item.setProperty('votes.rotten_user', omdb.get('tomatometerallaudience_votes', ''))
-            list_item.setProperty('rating.imdb', omdb.get('imdbRating', ''))
-            list_item.setProperty('votes.imdb', omdb.get('imdbVotes', ''))
-            list_item.setProperty('awards', omdb.get('awards', ''))
-            list_item.setProperty('release', omdb.get('DVD', ''))
-            
-            # Seta awards na Window(Home) para acesso no DialogVideoInfo
-            awards = omdb.get('awards', '')
-            if awards:
-                winprop('awards', awards)
\ No newline at end of file
+        omdb_set_properties(list_item, omdb_api(imdbnumber))
+
+
+def omdb_set_properties(list_item,omdb):
+    if omdb:
+        list_item.setProperty('rating.metacritic', omdb.get('metacritic', ''))
+        list_item.setProperty('rating.rotten', omdb.get('tomatometerallcritics', ''))
+        list_item.setProperty('rating.rotten_avg', omdb.get('tomatometerallcritics_avg', ''))
+        list_item.setProperty('votes.rotten', omdb.get('tomatometerallcritics_votes', ''))
+        list_item.setProperty('rating.rotten_user', omdb.get('tomatometerallaudience', ''))
+        list_item.setProperty('rating.rotten_user_avg', omdb.get('tomatometerallaudience_avg', ''))
+        list_item.setProperty('votes.rotten_user', omdb.get('tomatometerallaudience_votes', ''))
+        list_item.setProperty('rating.imdb', omdb.get('imdbRating', ''))
+        list_item.setProperty('votes.imdb', omdb.get('imdbVotes', ''))
+        list_item.setProperty('awards', omdb.get('awards', ''))
+        list_item.setProperty('release', omdb.get('DVD', ''))
+        
+        # Seta awards na Window(Home) para acesso no DialogVideoInfo
+        awards = omdb.get('awards', '')
+        if awards:
+            winprop('awards', awards)
\ No newline at end of file
@@ -7,6 +7,7 @@ import xbmc
 import requests
 
 from resources.lib.helper import *
+from resources.lib.tasks import TRAKT_LIMITER
 
 ########################
 
@@ -25,6 +26,7 @@ def trakt_api(call=None):
 
     for i in range(1,4): # loop if heavy server load
         try:
+            TRAKT_LIMITER.acquire()
             request = requests.get(request_url, timeout=5, headers=headers)
 
             if not request.ok:
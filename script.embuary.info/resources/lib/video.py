@@ -6,10 +6,11 @@
 import sys
 import xbmc
 import xbmcgui
-import requests
 
 from resources.lib.helper import *
 from resources.lib.tmdb import *
+from resources.lib.tasks import get_task_pool, FetchPlan, LazyResult
+from resources.lib.append_planner import tmdb_get_title, CONSUMER_PARTS
 
 ########################
 
@@ -21,7 +22,7 @@ FILTER_DAYDELTA = ADDON.getSettingInt('filter_daydelta')
 
 class TMDBVideos(object):
     def __init__(self, call_request):
-        self.result = {}
+        self.result = LazyResult()
         self.call = call_request['call']
         self.tmdb_id = call_request['tmdb_id']
         self.local_movies = call_request['local_movies']
@@ -31,55 +32,20 @@ class TMDBVideos(object):
 
         # NOVO: Suporte a carregamento modular
         self.mode = call_request.get('mode', 'full')
+        self.videos_en = None
+        self.plan = None
 
         if self.tmdb_id:
-            cache_key = self.call + str(self.tmdb_id)
-
-            # OTIMIZACAO: Carregar apenas os dados necessarios baseado no modo
-            append_items = self._get_append_items()
-
-            # Usa cache diferente para cada modo
-            if self.mode != 'full':
-                cache_key = f'{self.mode}_{self.call}_{self.tmdb_id}'
-
-            # OTIMIZAÇÃO: Usa cache SQLite para 'cast' (mais rápido)
-            if self.mode == 'cast':
-                from resources.lib.cache_manager import get_cache_manager
-                cache_mgr = get_cache_manager()
-                
-                # Busca do cache SQLite
-                sqlite_cache_key = 'cast_%s_%s' % (self.call, self.tmdb_id)
-                cached_cast = cache_mgr.get(sqlite_cache_key)
-                
-                if cached_cast:
-                    # Cache hit - cria estrutura compatível
-                    self.details = {'credits': {'cast': cached_cast}}
-                    self.created_by = ''
-                    self.crew = []
-                    self.details['crew'] = self.crew
-                    self.similar_duplicate_handler = list()
-                    self._process_mode()
-                    return
-            
-            # Cache padrão (JSON) para outros modos
-            self.details = get_cache(cache_key)
+            # Vídeos em inglês são buscados em paralelo com a consulta principal
+            if self.mode == 'youtube':
+                self.videos_en = self._start_videos_en()
 
-            if not self.details:
-                self.details = tmdb_query(action=self.call,
-                                          call=self.tmdb_id,
-                                          params={'append_to_response': append_items},
-                                          show_error=False
-                                          )
-
-                write_cache(cache_key, self.details)
-                
-                # OTIMIZAÇÃO: Salva cast no cache SQLite também
-                if self.mode == 'cast' and self.details:
-                    from resources.lib.cache_manager import get_cache_manager
-                    cache_mgr = get_cache_manager()
-                    cast_data = self.details.get('credits', {}).get('cast', [])[:15]
-                    sqlite_cache_key = 'cast_%s_%s' % (self.call, self.tmdb_id)
-                    cache_mgr.set(sqlite_cache_key, cast_data)
+            # Modo completo: sub-requisições independentes rodam em paralelo
+            if self.mode == 'full':
+                self.plan = self._start_plan()
+                self.details = self.plan.result('details')
+            else:
+                self.details = self._fetch_details()
 
             if not self.details:
                 return
@@ -92,20 +58,97 @@ class TMDBVideos(object):
             # PROCESSAMENTO MODULAR: Carrega apenas o que foi solicitado
             self._process_mode()
 
-    def _get_append_items(self):
-        """Retorna apenas os itens necessarios para o modo selecionado"""
-        mode_map = {
-            'cast': 'credits',
-            'crew': 'credits',
-            'details': 'release_dates,content_ratings,external_ids,credits',
-            'collection': 'external_ids',
-            'similar': 'similar',
-            'youtube': 'videos',
-            'images': '',
-            'seasons': 'external_ids',
-            'full': 'release_dates,content_ratings,external_ids,credits,videos,translations,similar'
-        }
-        return mode_map.get(self.mode, 'release_dates,content_ratings,external_ids,credits,videos,translations,similar')
+    def _fetch_details(self):
+        # Projeção do documento do título compartilhado com os outros consumidores
+        # (service, preload, bios); o planner só vai à rede para as partes que faltam.
+        # No modo completo só o esqueleto (detalhes, créditos, traduções) é aguardado.
+        if self.mode == 'full':
+            consumer = 'skeleton'
+        else:
+            consumer = self.mode if self.mode in CONSUMER_PARTS else 'full'
+
+        return tmdb_get_title(self.call, self.tmdb_id, consumer)
+
+    def _fetch_extras(self, details):
+        if not details:
+            return None
+        return tmdb_get_title(self.call, self.tmdb_id, 'extras')
+
+    def _start_plan(self):
+        """
+        Plano de requisições do modo completo:
+
+        - esqueleto do título (detalhes, créditos, traduções) e vídeos em inglês começam juntos
+        - vídeos, similares e imagens (extras), coleção e OMDb assim que o esqueleto chega
+        - verificação do YouTube assim que os extras chegam
+
+        O dialog abre com o esqueleto; as seções que dependem dos extras são
+        preenchidas quando eles chegam. A latência passa a ser a da cadeia mais
+        longa em vez da soma.
+        """
+        plan = FetchPlan(get_task_pool())
+        plan.add('details', self._fetch_details)
+        plan.add('extras', self._fetch_extras, after=['details'])
+        plan.add('collection', self._fetch_collection, after=['details'])
+        plan.add('omdb', self._fetch_omdb, after=['details'])
+
+        if not get_cache('ytvideos' + str(self.tmdb_id)):
+            if DEFAULT_LANGUAGE != FALLBACK_LANGUAGE:
+                plan.add('videos_en', self._fetch_videos_en)
+                plan.add('youtube', self._fetch_yt_videos, after=['extras', 'videos_en'])
+            else:
+                plan.add('youtube', self._fetch_yt_videos, after=['extras'])
+
+        return plan.start()
+
+    def _extras(self):
+        """Documento com vídeos, similares e imagens (etapa 'extras' no modo completo)"""
+        if self.plan and self.plan.has('extras'):
+            return self.plan.result('extras') or {}
+        return self.details
+
+    def _planned(self, name, fetch, *args):
+        """Resultado da etapa do plano ou, fora do modo completo, busca direta"""
+        if self.plan and self.plan.has(name):
+            return self.plan.result(name)
+        return fetch(*args)
+
+    def _fetch_videos_en(self):
+        return tmdb_query(action=self.call,
+                          call=self.tmdb_id,
+                          get='videos',
+                          use_language=False,
+                          show_error=False
+                          )
+
+    def _fetch_omdb(self, details):
+        if not details or not OMDB_API_KEY:
+            return None
+
+        if self.movie:
+            imdbnumber = details.get('imdb_id')
+        else:
+            imdbnumber = details.get('external_ids', {}).get('imdb_id')
+
+        # Só aquece o memo de omdb_api(), que omdb_properties() lê em get_details()
+        return omdb_api(imdbnumber) if imdbnumber else None
+
+    def _start_videos_en(self):
+        if DEFAULT_LANGUAGE == FALLBACK_LANGUAGE or get_cache('ytvideos' + str(self.tmdb_id)):
+            return None
+
+        return get_task_pool().submit(self._fetch_videos_en)
+
+    def _get_videos_en(self):
+        if self.videos_en is None:
+            self.videos_en = self._start_videos_en()
+            if self.videos_en is None:
+                return None
+
+        try:
+            return self.videos_en.result(timeout=10)
+        except Exception:
+            return None
 
     def _process_mode(self):
         """Processa apenas os dados solicitados no modo"""
@@ -134,14 +177,19 @@ class TMDBVideos(object):
             self.result['seasons'] = self.get_seasons()
 
         else:
-            self.result['details'] = self.get_details()
-            self.result['cast'] = self.get_cast()
-            self.result['crew'] = self.get_crew()
-            self.result['collection'] = self.get_collection()
-            self.result['similar'] = self.get_similar()
-            self.result['youtube'] = self.get_yt_videos()
-            self.result['backdrops'], self.result['posters'] = self.get_images()
-            self.result['seasons'] = self.get_seasons()
+            # Seções construídas sob demanda: o dialog constrói 'details' primeiro e
+            # o resto ao focar o container ou no preenchimento em background
+            self.result.add('details', self.get_details)
+            self.result.add('cast', self.get_cast)
+            self.result.add('crew', self.get_crew)
+            self.result.add('collection', self.get_collection)
+            self.result.add('similar', self.get_similar)
+            self.result.add('youtube', self.get_yt_videos)
+            self.result.add('images', self.get_images)
+            self.result.add('backdrops', lambda: self.result['images'][0])
+            self.result.add('posters', lambda: self.result['images'][1])
+            self.result.add('seasons', self.get_seasons)
+            self.result.add('omdb', self.get_omdb)
 
     def __getitem__(self, key):
         return self.result.get(key, '')
@@ -149,14 +197,22 @@ class TMDBVideos(object):
     def get_details(self):
         li = list()
 
+        # OMDb fica fora do caminho crítico: se a etapa do plano ainda não terminou,
+        # o dialog aplica as notas quando a seção 'omdb' fica pronta
+        omdb = not self.plan or self.plan.done('omdb')
+
         if self.movie:
-            list_item, is_local = tmdb_handle_movie(self.details, self.local_movies, full_info=True, fetch_reviews=True)
+            list_item, is_local = tmdb_handle_movie(self.details, self.local_movies, full_info=True, omdb=omdb)
         elif self.tvshow:
-            list_item, is_local = tmdb_handle_tvshow(self.details, self.local_shows, full_info=True, fetch_reviews=True)
+            list_item, is_local = tmdb_handle_tvshow(self.details, self.local_shows, full_info=True, omdb=omdb)
 
         li.append(list_item)
         return li
 
+    def get_omdb(self):
+        """Resultado do OMDb da etapa do plano (aguarda em background)"""
+        return self._planned('omdb', self._fetch_omdb, self.details) or {}
+
     def get_cast(self):
         li = list()
 
@@ -188,7 +244,7 @@ class TMDBVideos(object):
             li_crew_duplicate_handler_id.append(item['id'])
 
         for item in self.crew:
-            if item['job'] in ['Creator', 'Director', 'Producer', 'Screenplay', 'Writer', 'Original Music Composer', 'Novel', 'Storyboard', 'Executive Producer', 'Comic Book']:
+            if item['job'] in CREW_JOBS:
                 if item['id'] not in li_crew_duplicate_handler_id:
                     li_clean_crew.append(item)
                     li_crew_duplicate_handler_id.append(item['id'])
@@ -237,24 +293,31 @@ class TMDBVideos(object):
 
         return li
 
-    def get_collection(self):
-        collection = self.details.get('belongs_to_collection')
-        li = list()
+    def _fetch_collection(self, details):
+        collection = details.get('belongs_to_collection') if details else None
+        if not collection:
+            return None
+
+        collection_id = collection['id']
+
+        cache_key = 'collection' + str(collection_id)
+        collection_data = get_cache(cache_key)
 
-        if collection:
-            collection_id = collection['id']
+        if not collection_data:
+            collection_data = tmdb_query(action='collection',
+                                         call=collection_id
+                                         )
 
-            cache_key = 'collection' + str(collection_id)
-            collection_data = get_cache(cache_key)
+            write_cache(cache_key, collection_data)
 
-            if not collection_data:
-                collection_data = tmdb_query(action='collection',
-                                             call=collection_id
-                                             )
+        return collection_data
 
-                write_cache(cache_key, collection_data)
+    def get_collection(self):
+        collection_data = self._planned('collection', self._fetch_collection, self.details)
+        li = list()
 
-            if collection_data['parts']:
+        if collection_data:
+            if collection_data.get('parts'):
                 set_items = sort_dict(collection_data['parts'], 'release_date')
 
                 for item in set_items:
@@ -276,9 +339,12 @@ class TMDBVideos(object):
         return li
 
     def get_similar(self):
-        similar = self.details.get('similar', {}).get('results', [])
+        similar = self._extras().get('similar', {}).get('results', [])
         li = list()
 
+        # O filtro de duplicados depende da coleção já construída
+        self.result.get('collection')
+
         if self.movie:
             similar = sort_dict(similar, 'release_date',True)
 
@@ -309,58 +375,47 @@ class TMDBVideos(object):
         return li
 
     def get_images(self):
-        cache_key = 'images' + str(self.tmdb_id)
-        images = get_cache(cache_key)
+        # Imagens chegam via append_to_response=images (extras no modo completo)
+        images = self._extras().get('images') or {}
         li_backdrops = list()
         li_poster = list()
 
-        if not images:
-            images = tmdb_query(action=self.call,
-                                call=self.tmdb_id,
-                                get='images',
-                                params={'include_image_language': '%s,en,null' % DEFAULT_LANGUAGE}
-                                )
-
-            write_cache(cache_key, images)
-
-        for item in images['backdrops']:
+        for item in images.get('backdrops', []):
             list_item = tmdb_handle_images(item)
             li_backdrops.append(list_item)
 
-        for item in images['posters']:
+        for item in images.get('posters', []):
             list_item = tmdb_handle_images(item)
             li_poster.append(list_item)
 
         return li_backdrops, li_poster
 
-    def get_yt_videos(self):
-        cache_key = 'ytvideos' + str(self.tmdb_id)
-        videos = get_cache(cache_key)
-        li = list()
-
-        if not videos:
-            videos = self.details.get('videos', {}).get('results', [])
+    def _fetch_yt_videos(self, details, videos_en=None):
+        videos = (details or {}).get('videos', {}).get('results', []) + (videos_en or {}).get('results', [])
+        videos = [item for item in videos if item['site'] == 'YouTube']
 
-            if DEFAULT_LANGUAGE != FALLBACK_LANGUAGE:
-                videos_en = tmdb_query(action=self.call,
-                                        call=self.tmdb_id,
-                                        get='videos',
-                                        use_language=False
-                                        )
+        available = tmdb_yt_available([str(item['key']) for item in videos])
+        online_videos = []
+        for item in videos:
+            key = str(item['key'])
+            if key in available:
+                online_videos.append(item)
+                available.discard(key)
 
-                videos_en = videos_en.get('results')
-                videos = videos + videos_en
+        write_cache('ytvideos' + str(self.tmdb_id), online_videos)
+        return online_videos
 
-            online_videos = []
-            for item in videos:
-                request = requests.head('https://img.youtube.com/vi/%s/0.jpg' % str(item['key']))
-                if request.status_code == requests.codes.ok:
-                    online_videos.append(item)
+    def get_yt_videos(self):
+        li = list()
 
-            videos = online_videos
-            write_cache(cache_key, videos)
+        if self.plan and self.plan.has('youtube'):
+            videos = self.plan.result('youtube')
+        else:
+            videos = get_cache('ytvideos' + str(self.tmdb_id))
+            if not videos:
+                videos = self._fetch_yt_videos(self.details, self._get_videos_en())
 
-        for item in videos:
+        for item in videos or []:
             if item['site'] == 'YouTube':
                 list_item = tmdb_handle_yt_videos(item)
                 if not list_item == 404:
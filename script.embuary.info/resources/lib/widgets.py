@@ -194,7 +194,7 @@ def _nextaired(day):
             overview = [date_format(airing_date) + ' ' + airing_time, plot]
             overview ='[CR]'.join(filter(None, overview))
 
-            thumb = IMG_STILL + i.get('still_path') if i.get('still_path') else ''
+            thumb = tmdb_art(i.get('still_path'), 'still')
             if not thumb:
                 thumb = i['localart'].get('landscape') or i['localart'].get('fanart') or ''
 
@@ -416,17 +416,17 @@ def _add(items,call):
     if call == 'tv':
         for item in items:
             list_item, is_local = tmdb_handle_tvshow(item, local_items=local_items.get('shows', []))
-            xbmcplugin.addDirectoryItem(plugin.handle, plugin.url_for(dialog, 'tv', 'tmdb', item['id']), list_item)
+            xbmcplugin.addDirectoryItem(plugin.handle, plugin.url_for(dialog, 'tv', 'tmdb', item['id']), list_item.to_listitem())
 
     elif call == 'movie':
         for item in items:
             list_item, is_local = tmdb_handle_movie(item, local_items=local_items.get('movies', []))
-            xbmcplugin.addDirectoryItem(plugin.handle, plugin.url_for(dialog, 'movie', 'tmdb', item['id']), list_item)
+            xbmcplugin.addDirectoryItem(plugin.handle, plugin.url_for(dialog, 'movie', 'tmdb', item['id']), list_item.to_listitem())
 
     elif call == 'person':
         for item in items:
             list_item = tmdb_handle_person(item)
-            xbmcplugin.addDirectoryItem(plugin.handle, plugin.url_for(dialog, 'person', 'tmdb', item['id']), list_item)
+            xbmcplugin.addDirectoryItem(plugin.handle, plugin.url_for(dialog, 'person', 'tmdb', item['id']), list_item.to_listitem())
 
 def _category(content='',category='',call=None,info=None):
     if content == 'tv':
@@ -26,11 +26,18 @@ class CastPreloader(xbmc.Monitor):
     _cast_cache_memory = {}
     _processing_keys = set()
     _processing_lock = Lock()
+    _review_prefetch_keys = {}
     
     INTERVAL_FAST = 0.3
     INTERVAL_NORMAL = 0.5
     INTERVAL_SLOW = 2.0
     INTERVAL_IDLE = 3.0
+
+    # Vizinhos do item focado (antes/depois) com reviews pré-carregadas
+    REVIEW_PREFETCH_NEIGHBOURS = 2
+
+    # Acima deste número de chaves as expiradas são removidas
+    REVIEW_PREFETCH_KEYS_MAX = 1000
     
     def __init__(self):
         super(CastPreloader, self).__init__()
@@ -58,13 +65,12 @@ class CastPreloader(xbmc.Monitor):
             start = time.time()
             
             # 1. Warm-up do cache (dados)
-            recent_cast = self.cache_manager.get_recent_items('cast_', limit=1)
-            if recent_cast:
-                CastPreloader._cast_cache_memory.update(recent_cast)
+            from resources.lib.append_planner import get_append_planner
+            get_append_planner().warm(limit=1)
             
             self._warmup_complete = True
-            xbmc.log('[%s] Service Warm-up: %.2fs (cast:%d)' % 
-                     (ADDON_ID, time.time() - start, len(recent_cast or {})), xbmc.LOGINFO)
+            xbmc.log('[%s] Service Warm-up: %.2fs' % 
+                     (ADDON_ID, time.time() - start), xbmc.LOGINFO)
                      
         except Exception as e:
             xbmc.log('[%s] Service Warm-up error: %s' % (ADDON_ID, e), xbmc.LOGWARNING)
@@ -235,6 +241,92 @@ class CastPreloader(xbmc.Monitor):
         
         return None, media_type
 
+    # ============================================================
+    # REVIEWS TRAKT - Pré-carregamento em background
+    # ============================================================
+    def _get_review_prefetch_targets(self, tmdb_id, imdb_id, media_type):
+        """Item focado + vizinhos do container (lidos agora, antes do foco mudar)"""
+        targets = [(tmdb_id, imdb_id, media_type)]
+
+        for offset in range(-self.REVIEW_PREFETCH_NEIGHBOURS, self.REVIEW_PREFETCH_NEIGHBOURS + 1):
+            if offset == 0:
+                continue
+
+            prefix = 'Container.ListItemNoWrap(%d)' % offset
+            dbtype = xbmc.getInfoLabel('%s.DBType' % prefix)
+            if dbtype == 'movie':
+                n_media_type = 'movie'
+            elif dbtype in ['tvshow', 'season', 'episode']:
+                n_media_type = 'tv'
+            else:
+                continue
+
+            n_tmdb = xbmc.getInfoLabel('%s.UniqueID(tmdb)' % prefix)
+            n_imdb = xbmc.getInfoLabel('%s.IMDBNumber' % prefix)
+            if n_tmdb or n_imdb:
+                targets.append((n_tmdb, n_imdb, n_media_type))
+
+        return targets
+
+    def _prune_review_prefetch_keys(self, max_age):
+        """Remove as chaves de pré-carregamento mais antigas que o cache de reviews"""
+        if len(self._review_prefetch_keys) < self.REVIEW_PREFETCH_KEYS_MAX:
+            return
+
+        now = time.time()
+        with self._processing_lock:
+            expired = [key for key, prefetched in self._review_prefetch_keys.items() if now - prefetched >= max_age]
+            for key in expired:
+                del self._review_prefetch_keys[key]
+
+    def prefetch_reviews(self, targets):
+        """
+        Baixa reviews (e o mapeamento de slug) para o cache persistente do Trakt,
+        usando o rate limiter compartilhado. Ao abrir o dialog de info as reviews
+        já estão em cache e nunca aguardam o Trakt.
+        """
+        try:
+            from resources.lib.tmdb import tmdb_get_cached_reviews, tmdb_get_combined_reviews_parallel, CACHE_MAX_AGE
+
+            pending = {'movie': [], 'tv': []}
+
+            for tmdb_id, imdb_id, media_type in targets:
+                if (not tmdb_id or tmdb_id in ['None', '']) and imdb_id:
+                    tmdb_id, media_type = self._resolve_tmdb_id(imdb_id, media_type)
+
+                if not tmdb_id or tmdb_id == 'None' or media_type not in pending:
+                    continue
+
+                if tmdb_get_cached_reviews(tmdb_id, media_type) is not None:
+                    continue
+
+                # Chave com o horário do pré-carregamento: expira junto com o cache de reviews
+                review_key = '%s_%s' % (media_type, tmdb_id)
+                now = time.time()
+                with self._processing_lock:
+                    prefetched = self._review_prefetch_keys.get(review_key)
+                    if prefetched and now - prefetched < CACHE_MAX_AGE:
+                        continue
+                    self._review_prefetch_keys[review_key] = now
+
+                pending[media_type].append(tmdb_id)
+
+            for media_type, item_ids in pending.items():
+                if item_ids:
+                    tmdb_get_combined_reviews_parallel(item_ids, media_type)
+                    xbmc.log('[%s] Prefetched Trakt reviews for %d %s items' % (ADDON_ID, len(item_ids), media_type), xbmc.LOGDEBUG)
+
+                    # Falhas não entram no cache: liberadas para uma nova tentativa
+                    failed = [item_id for item_id in item_ids if tmdb_get_cached_reviews(item_id, media_type) is None]
+                    with self._processing_lock:
+                        for item_id in failed:
+                            self._review_prefetch_keys.pop('%s_%s' % (media_type, item_id), None)
+
+            self._prune_review_prefetch_keys(CACHE_MAX_AGE)
+
+        except Exception as e:
+            xbmc.log('[%s] Review prefetch error: %s' % (ADDON_ID, e), xbmc.LOGDEBUG)
+
     # ============================================================
     # Biografias (imports tardios)
     # ============================================================
@@ -343,14 +435,9 @@ class CastPreloader(xbmc.Monitor):
 
     def _get_movie_cast_from_tmdb(self, tmdb_id, media_type):
         try:
-            from resources.lib.tmdb import tmdb_query
+            from resources.lib.append_planner import tmdb_get_title
             action = 'tv' if media_type == 'tv' else 'movie'
-            details = tmdb_query(
-                action=action,
-                call=str(tmdb_id),
-                params={'append_to_response': 'credits', 'language': 'pt-BR'},
-                show_error=False
-            )
+            details = tmdb_get_title(action, tmdb_id, 'bios', language='pt-BR')
             
             if not details:
                 return []
@@ -492,47 +579,34 @@ class CastPreloader(xbmc.Monitor):
                     self.populate_cast_properties(t_id, m_type, i_id)  # ← ADICIONADO
 
                 Thread(target=_worker, args=(tmdb_id, media_type, imdb_id)).start()
+
+                from resources.lib.tasks import get_prefetch_pool
+                targets = self._get_review_prefetch_targets(tmdb_id, imdb_id, media_type)
+                get_prefetch_pool().submit(self.prefetch_reviews, targets)
         except:
             pass
 
     def fetch_and_set_metadata(self, tmdb_id, imdb_id, media_type, window_id=10000):
         try:
-            meta_cache_key = 'meta_%s_%s' % (media_type, tmdb_id)
-            cached_meta = self.cache_manager.get(meta_cache_key)
-            
-            if cached_meta:
-                for key, value in cached_meta.items():
-                    if value:
-                        xbmc.executebuiltin('SetProperty(%s,"%s",%d)' % (key, value, window_id))
-                    else:
-                        xbmc.executebuiltin('ClearProperty(%s,%d)' % (key, window_id))
-                return
+            # Sem cache próprio: meta é uma projeção do documento do título
+            # (append_planner) + OMDb, ambos já cacheados
 
             # Imports tardios - só carrega quando precisa
             from resources.lib.tmdb import tmdb_query, tmdb_get_cert, format_currency
+            from resources.lib.append_planner import tmdb_get_title
             from resources.lib.omdb import omdb_api
             
             meta_dict = {'budget': '', 'revenue': '', 'mpaa': '', 'studio': '', 'country': '', 'awards': '', 'imdb_combined': ''}
             
             if tmdb_id:
                 if media_type == 'tv':
-                    tv_data = tmdb_query(
-                        action='tv',
-                        call=str(tmdb_id),
-                        params={'append_to_response': 'content_ratings,external_ids'},
-                        show_error=False
-                    )
+                    tv_data = tmdb_get_title('tv', tmdb_id, 'meta')
                     
                     # FALLBACK: Se falhar e tiver IMDB, tenta achar o ID correto
                     if not tv_data and imdb_id:
                         new_tmdb_id, _ = self._resolve_tmdb_id(imdb_id, 'tv')
                         if new_tmdb_id and str(new_tmdb_id) != str(tmdb_id):
-                            tv_data = tmdb_query(
-                                action='tv',
-                                call=str(new_tmdb_id),
-                                params={'append_to_response': 'content_ratings,external_ids'},
-                                show_error=False
-                            )
+                            tv_data = tmdb_get_title('tv', new_tmdb_id, 'meta')
 
                     if tv_data:
                         meta_dict['mpaa'] = tmdb_get_cert(tv_data) or ''
@@ -545,23 +619,13 @@ class CastPreloader(xbmc.Monitor):
                         if not imdb_id:
                             imdb_id = tv_data.get('external_ids', {}).get('imdb_id')
                 else:
-                    movie_data = tmdb_query(
-                        action='movie',
-                        call=str(tmdb_id),
-                        params={'append_to_response': 'release_dates'},
-                        show_error=False
-                    )
+                    movie_data = tmdb_get_title('movie', tmdb_id, 'meta')
 
                     # FALLBACK: Se falhar e tiver IMDB, tenta achar o ID correto
                     if not movie_data and imdb_id:
                         new_tmdb_id, _ = self._resolve_tmdb_id(imdb_id, 'movie')
                         if new_tmdb_id and str(new_tmdb_id) != str(tmdb_id):
-                            movie_data = tmdb_query(
-                                action='movie',
-                                call=str(new_tmdb_id),
-                                params={'append_to_response': 'release_dates'},
-                                show_error=False
-                            )
+                            movie_data = tmdb_get_title('movie', new_tmdb_id, 'meta')
 
                     if movie_data:
                         meta_dict['budget'] = format_currency(movie_data.get('budget')) or ''
@@ -603,8 +667,6 @@ class CastPreloader(xbmc.Monitor):
                 except:
                     pass
             
-            self.cache_manager.set(meta_cache_key, meta_dict)
-            
             for key, value in meta_dict.items():
                 if value:
                     xbmc.executebuiltin('SetProperty(%s,"%s",%d)' % (key, value, window_id))
@@ -718,6 +780,9 @@ class CastPreloader(xbmc.Monitor):
         self._clear_cast_bios_property()
         self.cache_manager.shutdown()
         self.async_loader.shutdown()
+
+        from resources.lib.tasks import get_prefetch_pool
+        get_prefetch_pool().shutdown()
         xbmc.log('[%s] Service Stopped' % ADDON_ID, xbmc.LOGINFO)
 
 if __name__ == '__main__':